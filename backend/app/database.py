@@ -1,32 +1,37 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from app.config import get_settings
-from app.logging_config import get_logger
 
 settings = get_settings()
-logger = get_logger(__name__)
+
+
+def get_async_database_url(url: str) -> str:
+    """Use the asyncpg driver for plain postgresql:// URLs."""
+    if url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url[len("postgresql://"):]
+    return url
+
 
 # Create database engine
-engine = create_engine(
-    settings.database_url,
+engine = create_async_engine(
+    get_async_database_url(settings.database_url),
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    # LIFO keeps a small set of connections hot and lets idle extras expire
+    pool_use_lifo=True,
 )
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 # Base class for models
 Base = declarative_base()
 
-logger.info(f"Database engine created | pool_size=10 | max_overflow=20")
-
 
-def get_db():
+async def get_db():
     """Dependency to get database session."""
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
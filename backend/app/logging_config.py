@@ -4,42 +4,84 @@ Logging configuration for NewsFeed API.
 Provides structured logging with different formats for development and production:
 - Development: Human-readable colored output
 - Production: JSON format for log aggregators (ELK, CloudWatch, etc.)
+- Binary (opt-in): length-prefixed msgpack records sent to a local collector socket
 """
 
+import atexit
+import io
 import logging
+import logging.handlers
+import queue
+import socket
+import struct
 import sys
-import json
-from datetime import datetime
-from typing import Any
+import time
+from datetime import datetime, timezone
+
+import msgpack
+import orjson
 
 
 class JSONFormatter(logging.Formatter):
     """JSON formatter for production logs."""
     
+    # Static JSON fragments are encoded once; only per-record values are serialized
+    _TIMESTAMP_KEY = b'{"timestamp":'
+    _MESSAGE_KEY = b',"message":'
+    _EXCEPTION_KEY = b',"exception":'
+    _LOCATION_KEY = b',"location":'
+    _EXTRA_FIELDS = tuple(
+        (name, f',"{name}":'.encode()) for name in ("user_id", "request_id", "duration_ms")
+    )
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Level and logger names come from small fixed sets; encode each once
+        self._level_pieces: dict[str, bytes] = {}
+        self._logger_pieces: dict[str, bytes] = {}
+    
     def format(self, record: logging.LogRecord) -> str:
-        log_data: dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "level": record.levelname,
-            "logger": record.name,
-            "message": record.getMessage(),
-        }
+        dumps = orjson.dumps
         
-        # Add extra fields if present
-        if hasattr(record, "user_id"):
-            log_data["user_id"] = record.user_id
-        if hasattr(record, "request_id"):
-            log_data["request_id"] = record.request_id
-        if hasattr(record, "duration_ms"):
-            log_data["duration_ms"] = record.duration_ms
+        level_piece = self._level_pieces.get(record.levelname)
+        if level_piece is None:
+            level_piece = b',"level":' + dumps(record.levelname)
+            self._level_pieces[record.levelname] = level_piece
+        
+        logger_piece = self._logger_pieces.get(record.name)
+        if logger_piece is None:
+            logger_piece = b',"logger":' + dumps(record.name)
+            self._logger_pieces[record.name] = logger_piece
+        
+        buf = bytearray(self._TIMESTAMP_KEY)
+        # orjson serializes the datetime natively; OPT_UTC_Z renders "+00:00" as "Z"
+        buf += dumps(
+            datetime.fromtimestamp(record.created, tz=timezone.utc),
+            option=orjson.OPT_UTC_Z,
+        )
+        buf += level_piece
+        buf += logger_piece
+        buf += self._MESSAGE_KEY
+        buf += dumps(record.getMessage())
+        
+        # Add extra fields if present (a single dict lookup each)
+        fields = record.__dict__
+        for name, key in self._EXTRA_FIELDS:
+            if name in fields:
+                buf += key
+                buf += dumps(fields[name], default=str)
             
         # Add exception info if present
         if record.exc_info:
-            log_data["exception"] = self.formatException(record.exc_info)
+            buf += self._EXCEPTION_KEY
+            buf += dumps(self.formatException(record.exc_info))
             
         # Add location info
-        log_data["location"] = f"{record.filename}:{record.lineno}"
+        buf += self._LOCATION_KEY
+        buf += dumps(f"{record.filename}:{record.lineno}")
+        buf += b"}"
         
-        return json.dumps(log_data)
+        return buf.decode("utf-8")
 
 
 class ColoredFormatter(logging.Formatter):
@@ -56,19 +98,39 @@ class ColoredFormatter(logging.Formatter):
     RESET = "\033[0m"
     BOLD = "\033[1m"
     
+    LINE_FORMAT = "%s | %s | \033[90m%s\033[0m | \033[90m%s:%d\033[0m | %s"
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Pre-rendered, padded level labels so each record skips the ANSI string building
+        self._level_labels = {
+            level: f"{color}{self.BOLD}{level:8}{self.RESET}"
+            for level, color in self.COLORS.items()
+        }
+        # Timestamps have second resolution; reuse the last rendered one
+        self._last_second = -1
+        self._last_timestamp = ""
+    
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        if second != self._last_second:
+            self._last_timestamp = datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+            self._last_second = second
+        return self._last_timestamp
+    
     def format(self, record: logging.LogRecord) -> str:
-        # Get color for level
-        color = self.COLORS.get(record.levelname, self.RESET)
-        
-        # Format timestamp
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        level_str = self._level_labels.get(record.levelname)
+        if level_str is None:
+            level_str = f"{self.RESET}{self.BOLD}{record.levelname:8}{self.RESET}"
         
-        # Build the log message
-        level_str = f"{color}{self.BOLD}{record.levelname:8}{self.RESET}"
-        logger_str = f"\033[90m{record.name}\033[0m"
-        location_str = f"\033[90m{record.filename}:{record.lineno}\033[0m"
-        
-        formatted = f"{timestamp} | {level_str} | {logger_str} | {location_str} | {record.getMessage()}"
+        formatted = self.LINE_FORMAT % (
+            self._timestamp(record.created),
+            level_str,
+            record.name,
+            record.filename,
+            record.lineno,
+            record.getMessage(),
+        )
         
         # Add exception info if present
         if record.exc_info:
@@ -77,17 +139,166 @@ class ColoredFormatter(logging.Formatter):
         return formatted
 
 
-def setup_logging(environment: str = "development", log_level: str = "INFO") -> logging.Logger:
+class BinaryFormatter(logging.Formatter):
+    """Msgpack formatter for shipping logs to a local collector."""
+    
+    _EXTRA_FIELDS = ("user_id", "request_id", "duration_ms")
+    
+    def format_binary(self, record: logging.LogRecord) -> bytes:
+        """Pack a record into a length-prefixed msgpack frame."""
+        log_data = {
+            "ts": record.created,
+            "lvl": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "loc": f"{record.filename}:{record.lineno}",
+        }
+        
+        # Add extra fields if present
+        for name in self._EXTRA_FIELDS:
+            if hasattr(record, name):
+                log_data[name] = getattr(record, name)
+        
+        # Add exception info if present
+        if record.exc_info:
+            log_data["exception"] = self.formatException(record.exc_info)
+        
+        payload = msgpack.packb(log_data, default=str)
+        return struct.pack("<I", len(payload)) + payload
+
+
+class UnixDatagramHandler(logging.Handler):
+    """Handler that sends binary log frames to a Unix datagram socket."""
+    
+    # Dropped records are reported on stderr at most this often
+    DROP_REPORT_INTERVAL_SECONDS = 60.0
+    
+    def __init__(self, socket_path: str):
+        super().__init__()
+        self.socket_path = socket_path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._dropped = 0
+        self._last_drop_report = float("-inf")
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.sock.sendto(self.formatter.format_binary(record), self.socket_path)
+        except OSError as e:
+            # Best-effort sink (collector not listening, frame too large): drop
+            # the record, but never silently
+            self._report_drop(e)
+        except Exception:
+            self.handleError(record)
+    
+    def _report_drop(self, error: OSError) -> None:
+        """Count a dropped record; report the first drop, then at most once per interval."""
+        self._dropped += 1
+        now = time.monotonic()
+        if now - self._last_drop_report < self.DROP_REPORT_INTERVAL_SECONDS:
+            return
+        sys.stderr.write(
+            f"Log collector send failed | socket={self.socket_path} | error={error} "
+            f"| dropped={self._dropped}\n"
+        )
+        sys.stderr.flush()
+        self._dropped = 0
+        self._last_drop_report = now
+    
+    def close(self) -> None:
+        self.sock.close()
+        super().close()
+
+
+class QueuedRecordHandler(logging.handlers.QueueHandler):
+    """Queue handler that hands records to the listener thread unformatted."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue is in-process (nothing is pickled), so skip the default
+        # pre-formatting and leave formatting to the listener thread. Only the
+        # message is merged now, while the caller's args still hold the values logged.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """Stream handler that only flushes once the pending log queue is drained."""
+    
+    def __init__(self, stream: io.TextIOBase, pending: queue.SimpleQueue):
+        super().__init__(stream)
+        self._pending = pending
+    
+    def flush(self) -> None:
+        # emit() calls flush() after every record; batch bursts into one write
+        if self._pending.empty():
+            self.force_flush()
+    
+    def force_flush(self) -> None:
+        """Flush the underlying stream unconditionally."""
+        super().flush()
+
+
+LOG_FORMATS = ("text", "json", "binary")
+
+# Size of the stdout write buffer used by the log listener thread
+LOG_BUFFER_SIZE = 64 * 1024
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def _open_log_stream() -> io.TextIOBase:
+    """Open a large-buffered text stream on stdout's file descriptor."""
+    try:
+        fd = sys.stdout.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return sys.stdout
+    return open(fd, "w", buffering=LOG_BUFFER_SIZE, encoding="utf-8", closefd=False)
+
+
+def stop_logging() -> None:
+    """Stop the background log listener and flush any buffered output."""
+    global _listener
+    
+    if _listener is None:
+        return
+    
+    _listener.stop()
+    for handler in _listener.handlers:
+        if isinstance(handler, BufferedStreamHandler):
+            handler.force_flush()
+        else:
+            handler.close()
+    _listener = None
+
+
+atexit.register(stop_logging)
+
+
+def setup_logging(
+    environment: str = "development",
+    log_level: str = "INFO",
+    log_format: str = "",
+    log_socket_path: str = "",
+) -> logging.Logger:
     """
     Configure logging based on environment.
     
     Args:
         environment: 'development' or 'production'
         log_level: DEBUG, INFO, WARNING, ERROR, CRITICAL
+        log_format: 'text', 'json' or 'binary'; empty picks by environment
+        log_socket_path: Unix datagram socket of the collector for 'binary'
         
     Returns:
         Configured logger instance
+        
+    Raises:
+        ValueError: Unknown log_format
     """
+    # Fail before touching the current handlers
+    if log_format and log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format {log_format!r}; expected one of {', '.join(LOG_FORMATS)}")
+    
     # Convert log level string to logging constant
     numeric_level = getattr(logging, log_level.upper(), logging.INFO)
     
@@ -95,21 +306,32 @@ def setup_logging(environment: str = "development", log_level: str = "INFO") ->
     root_logger = logging.getLogger()
     root_logger.setLevel(numeric_level)
     
-    # Remove existing handlers
+    # Remove existing handlers and stop a previously started listener
     root_logger.handlers.clear()
+    stop_logging()
     
-    # Create console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(numeric_level)
+    if not log_format:
+        log_format = "json" if environment == "production" else "text"
     
-    # Set formatter based on environment
-    if environment == "production":
-        formatter = JSONFormatter()
+    # Create output handler; it runs on the listener thread behind a queue so
+    # formatting and writes stay off the request path
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    if log_format == "binary":
+        output_handler = UnixDatagramHandler(log_socket_path)
+        formatter = BinaryFormatter()
     else:
-        formatter = ColoredFormatter()
+        output_handler = BufferedStreamHandler(_open_log_stream(), log_queue)
+        formatter = JSONFormatter() if log_format == "json" else ColoredFormatter()
+    output_handler.setLevel(numeric_level)
+    
+    output_handler.setFormatter(formatter)
+    root_logger.addHandler(QueuedRecordHandler(log_queue))
     
-    console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    global _listener
+    _listener = logging.handlers.QueueListener(
+        log_queue, output_handler, respect_handler_level=True
+    )
+    _listener.start()
     
     # Configure third-party loggers to reduce noise
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -124,7 +346,8 @@ def setup_logging(environment: str = "development", log_level: str = "INFO") ->
     app_logger.setLevel(numeric_level)
     
     app_logger.info(
-        f"Logging initialized | environment={environment} | level={log_level}"
+        "Logging initialized | environment=%s | level=%s | format=%s",
+        environment, log_level, log_format,
     )
     
     return app_logger
@@ -1,11 +1,19 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from starlette.background import BackgroundTask, BackgroundTasks
+import logging
 import time
+import orjson
 
 from app.config import get_settings
+from app.database import engine
 from app.logging_config import setup_logging, get_logger
 from app.routers import keywords, articles, auth, summarize
+from app.services.authentik_service import get_authentik_service
+from app.services.news_service import get_news_service
+from app.services.openai_service import get_openai_service
 
 settings = get_settings()
 
@@ -13,6 +21,8 @@ settings = get_settings()
 setup_logging(
     environment=settings.environment,
     log_level=settings.log_level,
+    log_format=settings.log_format,
+    log_socket_path=settings.log_socket_path,
 )
 logger = get_logger(__name__)
 
@@ -22,13 +32,23 @@ async def lifespan(app: FastAPI):
     """Application lifespan handler for startup and shutdown events."""
     # Startup
     logger.info(
-        f"NewsFeed API starting | "
-        f"environment={settings.environment} | "
-        f"cors_origins={settings.cors_origins}"
+        "NewsFeed API starting | environment=%s | cors_origins=%s",
+        settings.environment,
+        settings.cors_origins,
+    )
+    logger.info(
+        "Database engine ready | pool_size=%d | max_overflow=%d | pool_recycle=%ds",
+        settings.db_pool_size,
+        settings.db_max_overflow,
+        settings.db_pool_recycle,
     )
     yield
     # Shutdown
     logger.info("NewsFeed API shutting down")
+    await engine.dispose()
+    await get_news_service().aclose()
+    await get_authentik_service().aclose()
+    await get_openai_service().aclose()
 
 
 app = FastAPI(
@@ -36,33 +56,54 @@ app = FastAPI(
     description="Personalized News Feed Application API",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
+async def log_request(method: str, path: str, status_code: int, duration_ms: float) -> None:
+    """Emit the access log line (async so the background task skips the threadpool)."""
+    logger.info("%s %s | status=%d | duration=%.2fms", method, path, status_code, duration_ms)
+
+
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Log all incoming requests with timing."""
-    start_time = time.time()
+    # Skip the timing work entirely when nothing would be logged: INFO is disabled,
+    # the request is an OPTIONS call, or it is a production health probe
+    if (
+        not logger.isEnabledFor(logging.INFO)
+        or request.method == "OPTIONS"
+        or (settings.environment == "production" and request.url.path == "/health")
+    ):
+        return await call_next(request)
+    
+    start_time = time.perf_counter()
     
     # Process request
     response = await call_next(request)
     
     # Calculate duration
-    duration_ms = (time.time() - start_time) * 1000
+    duration_ms = (time.perf_counter() - start_time) * 1000
     
-    # Log request (skip health checks in production to reduce noise)
-    if settings.environment != "production" or request.url.path != "/health":
-        logger.info(
-            f"{request.method} {request.url.path} | "
-            f"status={response.status_code} | "
-            f"duration={duration_ms:.2f}ms"
-        )
+    # Log request after the response is sent
+    log_task = BackgroundTask(
+        log_request,
+        request.method,
+        request.url.path,
+        response.status_code,
+        duration_ms,
+    )
+    if response.background is None:
+        response.background = log_task
+    else:
+        response.background = BackgroundTasks(tasks=[response.background, log_task])
     
     return response
 
 
-# Configure CORS
+# Configure CORS. Added after the logging middleware so it is the outermost layer:
+# preflight requests are answered here and never reach request logging.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins_list,
@@ -78,17 +119,22 @@ app.include_router(articles.router, prefix="/api/articles", tags=["Articles"])
 app.include_router(summarize.router, prefix="/api/summarize", tags=["Summarize"])
 
 
+# Static bodies for the probe endpoints, serialized once at import
+HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "newsfeed-api"})
+ROOT_BODY = orjson.dumps({
+    "message": "Welcome to NewsFeed API",
+    "docs": "/docs",
+    "health": "/health",
+})
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "newsfeed-api"}
+    return Response(content=HEALTH_BODY, media_type="application/json")
 
 
 @app.get("/")
 async def root():
     """Root endpoint."""
-    return {
-        "message": "Welcome to NewsFeed API",
-        "docs": "/docs",
-        "health": "/health",
-    }
+    return Response(content=ROOT_BODY, media_type="application/json")
@@ -1,6 +1,5 @@
-from sqlalchemy import Column, String, DateTime, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, Index, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import UUID
-from datetime import datetime
 import uuid
 
 from app.database import Base
@@ -12,12 +11,16 @@ class UserKeyword(Base):
     __tablename__ = "user_keywords"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(String(255), nullable=False, index=True)
+    user_id = Column(String(255), nullable=False)
     keyword = Column(String(100), nullable=False)
-    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    # Set by the database (like init.sql's DEFAULT NOW()) and read back via RETURNING
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     __table_args__ = (
+        # Also serves (user_id) and (user_id, keyword) lookups as its leading columns
         UniqueConstraint('user_id', 'keyword', name='uq_user_keyword'),
+        # Matches GET /keywords: one user's rows, newest first, without a sort step
+        Index('idx_user_keywords_user_id_created_at', user_id, created_at.desc()),
     )
     
     def __repr__(self):
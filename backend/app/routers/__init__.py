@@ -1,4 +1,3 @@
-from app.routers import keywords, articles
-
-__all__ = ["keywords", "articles"]
+from app.routers import keywords, articles, auth, summarize
 
+__all__ = ["keywords", "articles", "auth", "summarize"]
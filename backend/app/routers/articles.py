@@ -1,16 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+import orjson
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.keyword import UserKeyword
-from app.schemas.article import ArticleList, SortBy, Language, MatchMode
+from app.schemas.article import Article, ArticleList, SortBy, Language, MatchMode
 from app.services.auth_service import get_current_user
-from app.services.news_service import NewsService
+from app.services.keyword_cache import cache_if_unchanged, keyword_cache, keyword_generation
+from app.services.news_service import NewsService, get_news_service
 from app.logging_config import get_logger
 
 router = APIRouter()
 logger = get_logger(__name__)
 
+# Exception types whose traceback was logged recently
+TRACEBACK_LOG_WINDOW_SECONDS = 60
+traceback_log_window: TTLCache = TTLCache(maxsize=128, ttl=TRACEBACK_LOG_WINDOW_SECONDS)
+
+ARTICLE_FIELDS = frozenset(Article.model_fields)
+
+
+def _parse_fields(fields: str | None) -> frozenset[str] | None:
+    """Parse the comma-separated `fields` projection; None means every field."""
+    if not fields:
+        return None
+    requested = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    unknown = requested - ARTICLE_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown article fields: {', '.join(sorted(unknown))}",
+        )
+    return requested or None
+
 
 @router.get("", response_model=ArticleList)
 async def get_articles(
@@ -19,8 +43,10 @@ async def get_articles(
     sort_by: SortBy = Query(SortBy.published_at, description="Sort by: relevancy, popularity, publishedAt"),
     language: Language = Query(Language.en, description="Article language"),
     match_mode: MatchMode = Query(MatchMode.any, description="Keyword matching: 'any' (OR) or 'all' (AND)"),
-    db: Session = Depends(get_db),
+    fields: str | None = Query(None, description="Comma-separated article fields to return (default: all)"),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user),
+    news_service: NewsService = Depends(get_news_service),
 ):
     """
     Get articles based on the current user's saved keywords.
@@ -29,28 +55,30 @@ async def get_articles(
     - match_mode='all': Returns articles matching ALL of the user's keywords (AND logic)
     
     If the user has no keywords, returns an empty list.
+    List views can pass e.g. fields=title,url,source to receive only those keys.
     """
+    projection = _parse_fields(fields)
     user_id = current_user.get("sub")
     
-    # Get user's keywords
-    user_keywords = (
-        db.query(UserKeyword)
-        .filter(UserKeyword.user_id == user_id)
-        .all()
-    )
-    
-    keywords = [kw.keyword for kw in user_keywords]
+    # Get user's keywords (cached briefly, invalidated by the keywords router)
+    keywords = keyword_cache.get(user_id)
+    if keywords is None:
+        generation = keyword_generation(user_id)
+        # Select only the keyword column; full ORM objects are never needed here
+        result = await db.execute(
+            select(UserKeyword.keyword).where(UserKeyword.user_id == user_id)
+        )
+        keywords = list(result.scalars())
+        cache_if_unchanged(keyword_cache, user_id, generation, keywords)
     
     if not keywords:
-        logger.debug(f"No keywords found for user {user_id}, returning empty list")
+        logger.debug("No keywords found for user %s, returning empty list", user_id)
         return ArticleList(articles=[], totalResults=0)
     
     # Fetch articles from News API
-    news_service = NewsService()
-    
     logger.debug(
-        f"Fetching articles | user={user_id} | keywords={keywords} | "
-        f"page={page} | sort={sort_by.value} | lang={language.value} | mode={match_mode.value}"
+        "Fetching articles | user=%s | keywords=%s | page=%d | sort=%s | lang=%s | mode=%s",
+        user_id, keywords, page, sort_by.value, language.value, match_mode.value,
     )
     
     try:
@@ -64,14 +92,30 @@ async def get_articles(
         )
         
         logger.info(
-            f"Articles fetched | user={user_id} | count={len(articles.articles)} | "
-            f"total={articles.totalResults}"
+            "Articles fetched | user=%s | count=%d | total=%d",
+            user_id, len(articles.articles), articles.totalResults,
         )
         
-        return articles
+        # Serialize directly; returning the model would re-validate every article.
+        # A projection drops unrequested article fields before they are dumped.
+        include = None
+        if projection is not None:
+            include = {"articles": {"__all__": projection}, "totalResults": True, "status": True}
+        return Response(
+            content=orjson.dumps(articles.model_dump(mode="json", include=include)),
+            media_type="application/json",
+        )
     except ValueError as e:
-        logger.error(f"Configuration error fetching articles | user={user_id} | error={str(e)}")
+        logger.error("Configuration error fetching articles | user=%s | error=%s", user_id, e)
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
-        logger.error(f"Failed to fetch articles | user={user_id} | error={str(e)}", exc_info=True)
+        # During an upstream outage every request fails the same way; only format
+        # the full traceback once per exception type per window
+        error_type = type(e).__name__
+        log_traceback = error_type not in traceback_log_window
+        if log_traceback:
+            traceback_log_window[error_type] = True
+        logger.error(
+            "Failed to fetch articles | user=%s | error=%s", user_id, e, exc_info=log_traceback
+        )
         raise HTTPException(status_code=502, detail=f"Failed to fetch articles: {str(e)}")
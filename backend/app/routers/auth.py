@@ -1,6 +1,6 @@
 """Router for authentication endpoints."""
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.schemas.auth import (
@@ -10,9 +10,11 @@ from app.schemas.auth import (
     SignupResponse,
     UserInfo,
 )
+from app.services.auth_service import AuthService, get_auth_service
 from app.services.authentik_service import (
     AuthentikService,
     AuthentikServiceError,
+    get_authentik_service,
 )
 from app.logging_config import get_logger
 
@@ -20,17 +22,17 @@ router = APIRouter()
 security = HTTPBearer(auto_error=False)
 logger = get_logger(__name__)
 
-# Service instance
-authentik_service = AuthentikService()
-
 
 @router.post("/login", response_model=AuthResponse)
-async def login(request: LoginRequest):
+async def login(
+    request: LoginRequest,
+    authentik_service: AuthentikService = Depends(get_authentik_service),
+):
     """
     Authenticate user with username and password.
     Returns access token and user info on success.
     """
-    logger.info(f"Login attempt | username={request.username}")
+    logger.info("Login attempt | username=%s", request.username)
 
     try:
         result = await authentik_service.login(
@@ -49,7 +51,7 @@ async def login(request: LoginRequest):
         )
 
     except AuthentikServiceError as e:
-        logger.warning(f"Login failed | username={request.username} | error={e.message}")
+        logger.warning("Login failed | username=%s | error=%s", request.username, e.message)
         raise HTTPException(
             status_code=e.status_code,
             detail=e.message,
@@ -57,11 +59,14 @@ async def login(request: LoginRequest):
 
 
 @router.post("/signup", response_model=SignupResponse, status_code=201)
-async def signup(request: SignupRequest):
+async def signup(
+    request: SignupRequest,
+    authentik_service: AuthentikService = Depends(get_authentik_service),
+):
     """
     Create a new user account.
     """
-    logger.info(f"Signup attempt | username={request.username} | email={request.email}")
+    logger.info("Signup attempt | username=%s | email=%s", request.username, request.email)
 
     try:
         message = await authentik_service.signup(
@@ -76,7 +81,7 @@ async def signup(request: SignupRequest):
         )
 
     except AuthentikServiceError as e:
-        logger.warning(f"Signup failed | username={request.username} | error={e.message}")
+        logger.warning("Signup failed | username=%s | error=%s", request.username, e.message)
         raise HTTPException(
             status_code=e.status_code,
             detail=e.message,
@@ -84,15 +89,24 @@ async def signup(request: SignupRequest):
 
 
 @router.post("/logout", status_code=200)
-async def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def logout(
+    background_tasks: BackgroundTasks,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    authentik_service: AuthentikService = Depends(get_authentik_service),
+    auth_service: AuthService = Depends(get_auth_service),
+):
     """
     Logout user and invalidate the session.
+    Token revocation is best-effort and runs after the response is sent.
     """
     token = credentials.credentials if credentials else None
     
     logger.info("User logout initiated")
     
-    await authentik_service.logout(token)
+    if token:
+        # Stop trusting the cached validation now; revocation only lands later
+        auth_service.forget_token(token)
+        background_tasks.add_task(authentik_service.logout, token)
     
     logger.info("User logged out successfully")
     return {"message": "Logged out successfully"}
@@ -1,11 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from app.database import get_db
 from app.models.keyword import UserKeyword
-from app.schemas.keyword import KeywordCreate, KeywordResponse, KeywordList, DeleteResponse
+from app.schemas.keyword import (
+    KeywordCreate,
+    KeywordBulkCreate,
+    KeywordResponse,
+    KeywordBulkResponse,
+    KeywordList,
+    DeleteResponse,
+)
 from app.services.auth_service import get_current_user
+from app.services.keyword_cache import (
+    cache_if_unchanged,
+    invalidate_user_keywords,
+    keyword_generation,
+    keyword_list_cache,
+)
 from app.logging_config import get_logger
 
 router = APIRouter()
@@ -14,31 +30,45 @@ logger = get_logger(__name__)
 
 @router.get("", response_model=KeywordList)
 async def get_keywords(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
     """Get all keywords for the current user."""
     user_id = current_user.get("sub")
     
-    keywords = (
-        db.query(UserKeyword)
-        .filter(UserKeyword.user_id == user_id)
+    # Serve the cached response body until the user's keywords change
+    body = keyword_list_cache.get(user_id)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    
+    # Noted before the query; a keyword change committed meanwhile bumps it
+    generation = keyword_generation(user_id)
+    result = await db.execute(
+        select(UserKeyword)
+        .where(UserKeyword.user_id == user_id)
         .order_by(UserKeyword.created_at.desc())
-        .all()
     )
+    keywords = result.scalars().all()
     
-    logger.debug(f"Retrieved {len(keywords)} keywords for user {user_id}")
+    logger.debug("Retrieved %d keywords for user %s", len(keywords), user_id)
     
-    return KeywordList(
-        keywords=[KeywordResponse.model_validate(kw) for kw in keywords],
+    # Rows come straight from our own table, so skip per-row validation
+    payload = KeywordList.model_construct(
+        keywords=[
+            KeywordResponse.model_construct(id=kw.id, keyword=kw.keyword, created_at=kw.created_at)
+            for kw in keywords
+        ],
         total=len(keywords),
     )
+    body = orjson.dumps(payload.model_dump(mode="json"))
+    cache_if_unchanged(keyword_list_cache, user_id, generation, body)
+    return Response(content=body, media_type="application/json")
 
 
 @router.post("", response_model=KeywordResponse, status_code=status.HTTP_201_CREATED)
 async def create_keyword(
     keyword_data: KeywordCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
     """Add a new keyword for the current user."""
@@ -47,19 +77,21 @@ async def create_keyword(
     # Normalize keyword (lowercase, trimmed)
     normalized_keyword = keyword_data.keyword.strip().lower()
     
-    keyword = UserKeyword(
-        user_id=user_id,
-        keyword=normalized_keyword,
+    # RETURNING hands back the generated id/created_at, so no refresh query is needed
+    stmt = (
+        insert(UserKeyword)
+        .values(user_id=user_id, keyword=normalized_keyword)
+        .returning(UserKeyword)
     )
     
     try:
-        db.add(keyword)
-        db.commit()
-        db.refresh(keyword)
-        logger.info(f"Keyword created | user={user_id} | keyword={normalized_keyword}")
+        keyword = await db.scalar(stmt)
+        await db.commit()
+        invalidate_user_keywords(user_id)
+        logger.info("Keyword created | user=%s | keyword=%s", user_id, normalized_keyword)
     except IntegrityError:
-        db.rollback()
-        logger.warning(f"Duplicate keyword attempt | user={user_id} | keyword={normalized_keyword}")
+        await db.rollback()
+        logger.warning("Duplicate keyword attempt | user=%s | keyword=%s", user_id, normalized_keyword)
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Keyword '{normalized_keyword}' already exists",
@@ -68,10 +100,59 @@ async def create_keyword(
     return keyword
 
 
+@router.post("/bulk", response_model=KeywordBulkResponse, status_code=status.HTTP_201_CREATED)
+async def create_keywords_bulk(
+    keyword_data: KeywordBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Add several keywords for the current user in a single statement.
+    Keywords the user already has are skipped instead of failing the request.
+    """
+    user_id = current_user.get("sub")
+    
+    # Normalize and dedupe, keeping the order the client sent
+    normalized_keywords = [
+        kw for kw in dict.fromkeys(k.strip().lower() for k in keyword_data.keywords) if kw
+    ]
+    if not normalized_keywords:
+        return KeywordBulkResponse(created=[], skipped=[])
+
+    # ON CONFLICT is dialect-specific; PostgreSQL in production, SQLite in tests
+    dialect_insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    stmt = (
+        dialect_insert(UserKeyword)
+        .values([{"user_id": user_id, "keyword": kw} for kw in normalized_keywords])
+        .on_conflict_do_nothing(index_elements=["user_id", "keyword"])
+        .returning(UserKeyword)
+    )
+    result = await db.scalars(stmt)
+    created = result.all()
+    await db.commit()
+    invalidate_user_keywords(user_id)
+    
+    created_keywords = {kw.keyword for kw in created}
+    skipped = [kw for kw in normalized_keywords if kw not in created_keywords]
+    
+    logger.info(
+        "Keywords bulk created | user=%s | created=%d | skipped=%d",
+        user_id, len(created), len(skipped),
+    )
+    
+    return KeywordBulkResponse(
+        created=[
+            KeywordResponse.model_construct(id=kw.id, keyword=kw.keyword, created_at=kw.created_at)
+            for kw in created
+        ],
+        skipped=skipped,
+    )
+
+
 @router.delete("/{keyword}", response_model=DeleteResponse)
 async def delete_keyword(
     keyword: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
     """Remove a keyword for the current user."""
@@ -80,25 +161,27 @@ async def delete_keyword(
     # Normalize keyword for lookup
     normalized_keyword = keyword.strip().lower()
     
-    db_keyword = (
-        db.query(UserKeyword)
-        .filter(
+    result = await db.execute(
+        select(UserKeyword).where(
             UserKeyword.user_id == user_id,
             UserKeyword.keyword == normalized_keyword,
         )
-        .first()
     )
+    db_keyword = result.scalars().first()
     
     if not db_keyword:
-        logger.warning(f"Keyword not found for deletion | user={user_id} | keyword={normalized_keyword}")
+        logger.warning(
+            "Keyword not found for deletion | user=%s | keyword=%s", user_id, normalized_keyword
+        )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Keyword '{keyword}' not found",
         )
     
-    db.delete(db_keyword)
-    db.commit()
+    await db.delete(db_keyword)
+    await db.commit()
+    invalidate_user_keywords(user_id)
     
-    logger.info(f"Keyword deleted | user={user_id} | keyword={normalized_keyword}")
+    logger.info("Keyword deleted | user=%s | keyword=%s", user_id, normalized_keyword)
     
     return DeleteResponse(message=f"Keyword '{keyword}' deleted successfully")
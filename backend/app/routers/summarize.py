@@ -1,21 +1,24 @@
 """Router for AI article summarization."""
 
+from typing import AsyncIterator
+
+import orjson
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 
 from app.schemas.summarize import SummarizeRequest, SummarizeResponse, SummarizeStatus
 from app.services.auth_service import get_current_user
-from app.services.openai_service import OpenAIService, OpenAIServiceError
+from app.services.openai_service import OpenAIService, OpenAIServiceError, get_openai_service
 from app.logging_config import get_logger
 
 router = APIRouter()
 logger = get_logger(__name__)
 
-# Service instance (could be injected via dependency in production)
-openai_service = OpenAIService()
-
 
 @router.get("/status", response_model=SummarizeStatus)
-async def get_summarize_status():
+async def get_summarize_status(
+    openai_service: OpenAIService = Depends(get_openai_service),
+):
     """
     Check if AI summarization is available.
     Returns enabled=true if OPENAI_API_KEY is configured.
@@ -31,10 +34,23 @@ async def get_summarize_status():
     )
 
 
+def _articles_for_service(request: SummarizeRequest) -> list[dict]:
+    """Convert request articles to the service's dict format."""
+    return [
+        {
+            "title": art.title,
+            "source": art.source,
+            "description": art.description,
+        }
+        for art in request.articles
+    ]
+
+
 @router.post("", response_model=SummarizeResponse)
 async def summarize_articles(
     request: SummarizeRequest,
     current_user: dict = Depends(get_current_user),
+    openai_service: OpenAIService = Depends(get_openai_service),
 ):
     """
     Summarize a list of articles using OpenAI's Responses API.
@@ -42,28 +58,76 @@ async def summarize_articles(
     """
     user_id = current_user.get("sub")
     
-    logger.info(f"Summarizing {len(request.articles)} articles | user={user_id}")
+    logger.info("Summarizing %d articles | user=%s", len(request.articles), user_id)
     
-    # Convert request articles to dict format expected by service
-    articles_data = [
-        {
-            "title": art.title,
-            "source": art.source,
-            "description": art.description,
-        }
-        for art in request.articles
-    ]
+    articles_data = _articles_for_service(request)
     
     try:
         summary = await openai_service.summarize_articles(articles_data)
         
-        logger.info(f"Summary generated | user={user_id} | length={len(summary)}")
+        logger.info("Summary generated | user=%s | length=%d", user_id, len(summary))
         
         return SummarizeResponse(summary=summary)
         
     except OpenAIServiceError as e:
-        logger.error(f"OpenAI service error | user={user_id} | error={e.message}")
+        logger.error("OpenAI service error | user=%s | error=%s", user_id, e.message)
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.message,
+        )
+
+
+async def _summary_events(first: str | None, chunks: AsyncIterator[str], user_id: str):
+    """Encode summary text as Server-Sent Events, ending with a done (or error) event."""
+    try:
+        if first is not None:
+            yield b"data: " + orjson.dumps({"delta": first}) + b"\n\n"
+        async for delta in chunks:
+            yield b"data: " + orjson.dumps({"delta": delta}) + b"\n\n"
+    except OpenAIServiceError as e:
+        # Headers are already sent, so the error travels as an event
+        logger.error("OpenAI stream error | user=%s | error=%s", user_id, e.message)
+        yield b"event: error\ndata: " + orjson.dumps(
+            {"detail": e.message, "status_code": e.status_code}
+        ) + b"\n\n"
+        return
+    yield b"event: done\ndata: {}\n\n"
+
+
+@router.post("/stream")
+async def stream_summary(
+    request: SummarizeRequest,
+    current_user: dict = Depends(get_current_user),
+    openai_service: OpenAIService = Depends(get_openai_service),
+):
+    """
+    Summarize articles as Server-Sent Events, forwarding text as OpenAI generates it.
+    Each `data` event carries {"delta": "..."}; the stream ends with a `done` event,
+    or an `error` event carrying {"detail", "status_code"}.
+    """
+    user_id = current_user.get("sub")
+    
+    logger.info("Streaming summary of %d articles | user=%s", len(request.articles), user_id)
+    
+    articles_data = _articles_for_service(request)
+    
+    # Wait for the first chunk so failures before any output (missing key, bad
+    # credentials, rate limits) still get a proper HTTP status
+    chunks = openai_service.stream_summary(articles_data)
+    try:
+        first = await anext(chunks)
+    except StopAsyncIteration:
+        first = None
+    except OpenAIServiceError as e:
+        logger.error("OpenAI service error | user=%s | error=%s", user_id, e.message)
         raise HTTPException(
             status_code=e.status_code,
             detail=e.message,
         )
+    
+    return StreamingResponse(
+        _summary_events(first, chunks, user_id),
+        media_type="text/event-stream",
+        # Keep proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -2,6 +2,9 @@ import re
 from pydantic import BaseModel, Field, EmailStr, field_validator
 from typing import Optional
 
+# Lowercase letters and digits only; compiled once at import
+USERNAME_PATTERN = re.compile(r'[a-z0-9]+')
+
 
 class LoginRequest(BaseModel):
     """Schema for login request."""
@@ -19,7 +22,7 @@ class SignupRequest(BaseModel):
     @classmethod
     def validate_username(cls, v: str) -> str:
         # Only allow lowercase letters and numbers
-        if not re.match(r'^[a-z0-9]+$', v):
+        if not USERNAME_PATTERN.fullmatch(v):
             raise ValueError('Username must contain only lowercase letters and numbers (no spaces, uppercase, or special characters)')
         return v
 
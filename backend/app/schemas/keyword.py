@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
+from typing import Annotated
 from uuid import UUID
 
 
@@ -8,6 +9,13 @@ class KeywordCreate(BaseModel):
     keyword: str = Field(..., min_length=1, max_length=100)
 
 
+class KeywordBulkCreate(BaseModel):
+    """Schema for creating several keywords at once."""
+    keywords: list[Annotated[str, Field(min_length=1, max_length=100)]] = Field(
+        ..., min_length=1, max_length=50
+    )
+
+
 class KeywordResponse(BaseModel):
     """Schema for keyword response."""
     id: UUID
@@ -23,6 +31,12 @@ class KeywordList(BaseModel):
     total: int
 
 
+class KeywordBulkResponse(BaseModel):
+    """Schema for bulk keyword creation response."""
+    created: list[KeywordResponse]
+    skipped: list[str]
+
+
 class DeleteResponse(BaseModel):
     """Schema for delete operation response."""
     message: str
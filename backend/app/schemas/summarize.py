@@ -4,10 +4,10 @@ from pydantic import BaseModel, Field
 
 
 class ArticleForSummary(BaseModel):
-    """Article data for summarization."""
-    title: str
-    description: str | None = None
-    source: str | None = None
+    """Article data for summarization. Over-long fields are rejected with 422."""
+    title: str = Field(..., max_length=500)
+    description: str | None = Field(None, max_length=5_000)
+    source: str | None = Field(None, max_length=200)
 
 
 class SummarizeRequest(BaseModel):
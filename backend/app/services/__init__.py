@@ -1,5 +1,5 @@
-from app.services.auth_service import AuthService, get_current_user
-from app.services.news_service import NewsService
+from app.services.auth_service import AuthService, get_auth_service, get_current_user
+from app.services.news_service import NewsService, get_news_service
 
-__all__ = ["AuthService", "get_current_user", "NewsService"]
+__all__ = ["AuthService", "get_auth_service", "get_current_user", "NewsService", "get_news_service"]
 
@@ -1,10 +1,19 @@
-import jwt
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
+import time
+import orjson
 import httpx
+from cachetools import TTLCache
+from functools import lru_cache
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.config import get_settings
 from app.logging_config import get_logger
+from app.services.authentik_service import get_authentik_service
 
 settings = get_settings()
 security = HTTPBearer(auto_error=False)
@@ -14,34 +23,114 @@ logger = get_logger(__name__)
 class AuthService:
     """Service for token validation."""
 
+    USERINFO_TIMEOUT_SECONDS = 10.0
+    # Our app tokens carry a handful of short claims; anything longer is not one of them
+    MAX_APP_JWT_LENGTH = 4096
+    # Every authenticated request re-presents the same bearer token; remember the
+    # outcome so repeat requests skip the HMAC check and userinfo calls.
+    # An app JWT's validity only depends on its signature and exp, so it can be
+    # trusted longer than an Authentik token, which can be revoked upstream.
+    APP_JWT_CACHE_TTL_SECONDS = 300
+    TOKEN_CACHE_MAX_ENTRIES = 10_000
+    # Rejections are cached for a shorter window to absorb floods of bad tokens.
+    # Kept short because an Authentik timeout also counts as a rejection.
+    INVALID_TOKEN_CACHE_TTL_SECONDS = 5
+    INVALID_TOKEN_CACHE_MAX_ENTRIES = 1_000
+
     def __init__(self):
         self.authentik_url = settings.authentik_url
+        self.userinfo_url = f"{self.authentik_url}/application/o/userinfo/"
         self.jwt_secret = settings.authentik_client_id  # Same secret used in auth router
+        # Encode the HMAC key once instead of on every decode
+        self._jwt_key = self.jwt_secret.encode("utf-8")
+        # Authentik tokens can be revoked upstream; how long to trust a userinfo answer
+        self.userinfo_cache_ttl = settings.userinfo_cache_ttl
+        # Maps token digest -> (user info, unix time the entry expires)
+        self._token_cache: TTLCache = TTLCache(
+            maxsize=self.TOKEN_CACHE_MAX_ENTRIES,
+            ttl=max(self.APP_JWT_CACHE_TTL_SECONDS, self.userinfo_cache_ttl),
+        )
+        # Digests of recently rejected tokens, kept apart so a spray of bad
+        # tokens cannot evict valid sessions from the cache above
+        self._invalid_tokens: TTLCache = TTLCache(
+            maxsize=self.INVALID_TOKEN_CACHE_MAX_ENTRIES,
+            ttl=self.INVALID_TOKEN_CACHE_TTL_SECONDS,
+        )
+        # Authentik validations in flight, keyed like the cache
+        self._pending: dict[bytes, asyncio.Task] = {}
 
-    def validate_app_jwt(self, token: str) -> dict | None:
+    def _is_app_jwt_shaped(self, token: str) -> bool:
+        """Cheap structural check so opaque tokens never reach the decode path."""
+        return len(token) <= self.MAX_APP_JWT_LENGTH and token.count(".") == 2
+
+    def _decode_app_jwt(self, token: str) -> dict | None:
         """
-        Validate our application's JWT tokens.
+        Verify an application JWT and return its raw claims.
+        App tokens are only ever issued by us with HS256, so the signature is checked
+        directly rather than through PyJWT's algorithm registry; the header must
+        still name HS256, so tokens declaring another algorithm (e.g. "none") fail.
         """
         try:
-            payload = jwt.decode(
-                token,
-                self.jwt_secret,
-                algorithms=["HS256"],
-            )
-            user_id = payload.get("sub", "")
-            logger.debug(f"App JWT validated successfully | user_id={user_id}")
-            return {
-                "sub": user_id,
-                "email": payload.get("email", ""),
-                "name": payload.get("name", ""),
-                "preferred_username": payload.get("preferred_username", ""),
-            }
-        except jwt.ExpiredSignatureError:
+            header_b64, payload_b64, signature_b64 = token.split(".")
+            header = orjson.loads(_b64url_decode(header_b64))
+            if not isinstance(header, dict) or header.get("alg") != "HS256":
+                logger.debug("App JWT invalid: unexpected algorithm")
+                return None
+            expected = hmac.new(
+                self._jwt_key, f"{header_b64}.{payload_b64}".encode("ascii"), hashlib.sha256
+            ).digest()
+            if not hmac.compare_digest(expected, _b64url_decode(signature_b64)):
+                logger.debug("App JWT invalid: signature mismatch")
+                return None
+            payload = orjson.loads(_b64url_decode(payload_b64))
+        except (ValueError, binascii.Error, orjson.JSONDecodeError):
+            logger.debug("App JWT invalid: malformed token")
+            return None
+
+        if not isinstance(payload, dict):
+            logger.debug("App JWT invalid: claims are not an object")
+            return None
+        # App tokens are always issued with an exp; a token without one is not ours
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or isinstance(exp, bool):
+            logger.debug("App JWT invalid: missing or non-numeric exp")
+            return None
+        now = time.time()
+        if exp <= now:
             logger.debug("App JWT expired")
             return None
-        except jwt.InvalidTokenError as e:
-            logger.debug(f"App JWT invalid: {str(e)}")
+        # We never issue nbf, but honor it like PyJWT does if a token carries one
+        nbf = payload.get("nbf")
+        if nbf is not None:
+            if not isinstance(nbf, (int, float)) or isinstance(nbf, bool):
+                logger.debug("App JWT invalid: non-numeric nbf")
+                return None
+            if nbf > now:
+                logger.debug("App JWT not yet valid")
+                return None
+        return payload
+
+    @staticmethod
+    def _user_info(payload: dict) -> dict:
+        """Build the user info dict exposed to routers from JWT claims."""
+        return {
+            "sub": payload.get("sub", ""),
+            "email": payload.get("email", ""),
+            "name": payload.get("name", ""),
+            "preferred_username": payload.get("preferred_username", ""),
+        }
+
+    def validate_app_jwt(self, token: str) -> dict | None:
+        """
+        Validate our application's JWT tokens.
+        """
+        if not self._is_app_jwt_shaped(token):
+            return None
+        payload = self._decode_app_jwt(token)
+        if payload is None:
             return None
+        logger.debug("App JWT validated successfully | user_id=%s", payload.get("sub", ""))
+        return self._user_info(payload)
 
     async def validate_authentik_token(self, token: str) -> dict | None:
         """
@@ -49,40 +138,99 @@ class AuthService:
         """
         try:
             logger.debug("Attempting Authentik token validation")
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.authentik_url}/application/o/userinfo/",
-                    headers={"Authorization": f"Bearer {token}"},
-                    timeout=10.0,
-                )
-                if response.status_code == 200:
-                    user_info = response.json()
-                    logger.debug(f"Authentik token validated | user={user_info.get('sub', 'unknown')}")
-                    return user_info
-                logger.debug(f"Authentik token validation failed | status={response.status_code}")
-                return None
+            # Shared long-lived Authentik client; it never stores cookies
+            response = await get_authentik_service().client.get(
+                self.userinfo_url,
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=self.USERINFO_TIMEOUT_SECONDS,
+            )
+            if response.status_code == 200:
+                user_info = orjson.loads(response.content)
+                logger.debug("Authentik token validated | user=%s", user_info.get("sub", "unknown"))
+                return user_info
+            logger.debug("Authentik token validation failed | status=%d", response.status_code)
+            return None
         except httpx.TimeoutException:
             logger.warning("Authentik token validation timeout")
             return None
         except Exception as e:
-            logger.debug(f"Authentik token validation error: {str(e)}")
+            logger.debug("Authentik token validation error: %s", e)
             return None
 
+    async def _validate_authentik_once(self, cache_key: bytes, token: str) -> dict | None:
+        """
+        Validate with Authentik, sharing one userinfo call between concurrent
+        requests that carry the same token.
+        """
+        task = self._pending.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self.validate_authentik_token(token))
+            self._pending[cache_key] = task
+            task.add_done_callback(lambda _: self._pending.pop(cache_key, None))
+        # Shielded so one caller disconnecting does not cancel the call for the others
+        return await asyncio.shield(task)
+
     async def validate_token(self, token: str) -> dict | None:
         """
         Validate token - first try our app JWT, then Authentik.
+        Results are cached briefly, keyed by a digest of the token.
         """
-        # First, try to validate as our app's JWT
-        user_info = self.validate_app_jwt(token)
-        if user_info:
-            return user_info
+        now = time.time()
+        cache_key = _token_cache_key(token)
+        if cache_key in self._invalid_tokens:
+            return None
+        cached = self._token_cache.get(cache_key)
+        if cached is not None:
+            user_info, expires_at = cached
+            if now < expires_at:
+                return user_info
+            self._token_cache.pop(cache_key, None)
         
-        # Fallback to Authentik validation
-        return await self.validate_authentik_token(token)
+        # First, try to validate as our app's JWT. Anything that is not three
+        # dot-separated segments of plausible size is an opaque Authentik token;
+        # skip the decode attempt entirely.
+        payload = self._decode_app_jwt(token) if self._is_app_jwt_shaped(token) else None
+        if payload is not None:
+            user_info = self._user_info(payload)
+            # Never serve a token from cache past its own expiry
+            expires_at = min(now + self.APP_JWT_CACHE_TTL_SECONDS, payload.get("exp", now))
+        else:
+            # Fallback to Authentik validation
+            user_info = await self._validate_authentik_once(cache_key, token)
+            if user_info is None:
+                self._invalid_tokens[cache_key] = True
+                return None
+            expires_at = now + self.userinfo_cache_ttl
+        
+        self._token_cache[cache_key] = (user_info, expires_at)
+        return user_info
+
+    def forget_token(self, token: str) -> None:
+        """Drop a token's cached validation (e.g. on logout) so it is checked afresh."""
+        cache_key = _token_cache_key(token)
+        self._token_cache.pop(cache_key, None)
+        self._pending.pop(cache_key, None)
+
+
+def _token_cache_key(token: str) -> bytes:
+    """Digest a token for the validation caches, so raw tokens are never stored."""
+    return hashlib.sha256(token.encode("utf-8")).digest()[:16]
+
+
+def _b64url_decode(segment: str) -> bytes:
+    """Decode an unpadded base64url JWT segment."""
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+@lru_cache()
+def get_auth_service() -> AuthService:
+    """Get the shared AuthService instance (built once per process)."""
+    return AuthService()
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
+    auth_service: AuthService = Depends(get_auth_service),
 ) -> dict:
     """
     Require authentication. Returns user info or raises 401.
@@ -95,7 +243,6 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    auth_service = AuthService()
     user_info = await auth_service.validate_token(credentials.credentials)
     
     if user_info is None:
@@ -106,5 +253,5 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    logger.debug(f"User authenticated | user_id={user_info.get('sub')}")
+    logger.debug("User authenticated | user_id=%s", user_info.get("sub"))
     return user_info
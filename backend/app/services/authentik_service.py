@@ -2,8 +2,12 @@
 
 import httpx
 import jwt
-from datetime import datetime, timedelta
+import orjson
+import time
+from cachetools import TTLCache
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 from app.config import get_settings
@@ -51,6 +55,14 @@ class MFARequiredError(AuthentikServiceError):
         super().__init__(message, status_code=400)
 
 
+class SharedTransport(httpx.AsyncHTTPTransport):
+    """Connection pool that outlives the short-lived clients built on top of it."""
+
+    async def __aexit__(self, *args) -> None:
+        # Closed explicitly via AuthentikService.aclose() instead of per client
+        pass
+
+
 @dataclass
 class UserData:
     """User data from Authentik."""
@@ -72,22 +84,133 @@ class AuthentikService:
 
     TIMEOUT_SECONDS = 15.0
     TOKEN_EXPIRY_HOURS = 24
+    REVOKE_TIMEOUT_SECONDS = 10.0
+    MAX_KEEPALIVE_CONNECTIONS = 20
+    AUTH_FLOW_SLUG = "default-authentication-flow"
+    ENROLLMENT_FLOW_SLUG = "newsfeed-enrollment"
+    # Shared by every flow executor call; httpx copies params, so one dict is safe
+    FLOW_QUERY_PARAMS = {"query": ""}
+    # Flow executor bodies are serialized with orjson and sent as raw content
+    JSON_HEADERS = {"Content-Type": "application/json"}
+    # Flow stages login can answer directly with the user's credentials
+    CREDENTIAL_STAGES = ("ak-stage-identification", "ak-stage-password")
+    DEFAULT_FIRST_STAGE = "ak-stage-identification"
+    # Cached in place of a stage when a flow turned out to need the discovery GET
+    FLOW_INIT_REQUIRED = "flow-init-required"
+    # Stages we cannot complete on the user's behalf
+    MFA_STAGES = frozenset({"ak-stage-authenticator-validate", "ak-stage-authenticator-totp"})
+    FLOW_COMPONENT_CACHE_TTL_SECONDS = 600
 
     def __init__(self):
         self.base_url = settings.authentik_url
         self.client_id = settings.authentik_client_id
+        # Encode the HMAC signing key once instead of on every token
+        self._jwt_key = self.client_id.encode("utf-8")
+        self.auth_flow_url = f"{self.base_url}/api/v3/flows/executor/{self.AUTH_FLOW_SLUG}/"
+        self.enrollment_flow_url = f"{self.base_url}/api/v3/flows/executor/{self.ENROLLMENT_FLOW_SLUG}/"
+        self.current_user_url = f"{self.base_url}/api/v3/core/users/me/"
+        self.revoke_url = f"{self.base_url}/application/o/revoke/"
+        self._transport: Optional[SharedTransport] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        # First stage component of each flow, keyed by flow slug, so flows can be
+        # answered without a discovery GET (FLOW_INIT_REQUIRED when login needs it)
+        self._flow_components: TTLCache = TTLCache(
+            maxsize=4, ttl=self.FLOW_COMPONENT_CACHE_TTL_SECONDS
+        )
+
+    @property
+    def transport(self) -> SharedTransport:
+        """Lazy initialization of the connection pool shared by all Authentik calls."""
+        if self._transport is None:
+            self._transport = SharedTransport(
+                limits=httpx.Limits(max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS),
+            )
+        return self._transport
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Long-lived client for stateless calls (token revocation, userinfo).
+        Its cookie jar accepts nothing, so no session can leak between users.
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                transport=self.transport,
+                timeout=self.TIMEOUT_SECONDS,
+                cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+            )
+        return self._client
+
+    def _http_client(self, timeout: float = TIMEOUT_SECONDS) -> httpx.AsyncClient:
+        """
+        Create a client with a fresh cookie jar on top of the shared connection pool.
+        Authentik tracks flow progress in a session cookie, so every flow needs its own jar;
+        httpx gives each new client an empty one, and only this thin wrapper is allocated.
+        """
+        return httpx.AsyncClient(
+            transport=self.transport,
+            timeout=timeout,
+            follow_redirects=True,
+        )
+
+    async def aclose(self) -> None:
+        """Close pooled connections to Authentik."""
+        # The stateless client only borrows the transport; closing the pool is enough
+        self._client = None
+        if self._transport is not None:
+            await self._transport.aclose()
+            self._transport = None
+
+    async def _submit_credentials(
+        self, client: httpx.AsyncClient, component: str, username: str, password: str
+    ) -> dict:
+        """Answer the identification and/or password stage of the authentication flow."""
+        if component == "ak-stage-identification":
+            submit_response = await client.post(
+                self.auth_flow_url,
+                content=orjson.dumps({
+                    "component": "ak-stage-identification",
+                    "uid_field": username,
+                    "password": password,
+                }),
+                headers=self.JSON_HEADERS,
+                params=self.FLOW_QUERY_PARAMS,
+            )
+            response_data = orjson.loads(submit_response.content)
+
+            # Identification and password usually complete in this one POST; only
+            # a flow with a separate password stage needs the second round trip.
+            # The two POSTs must stay sequential: both advance the same flow plan
+            # in the session, so sending them concurrently would race on it.
+            if response_data.get("component") != "ak-stage-password":
+                return response_data
+            logger.debug("Proceeding to password stage")
+
+        # Flow is at the password stage; no identification POST needed
+        submit_response = await client.post(
+            self.auth_flow_url,
+            content=orjson.dumps({
+                "component": "ak-stage-password",
+                "password": password,
+            }),
+            headers=self.JSON_HEADERS,
+            params=self.FLOW_QUERY_PARAMS,
+        )
+        return orjson.loads(submit_response.content)
 
     def _create_app_token(self, user_data: dict) -> str:
         """Create a JWT token for our application."""
+        # One clock read, as integer epoch seconds (the NumericDate JWT stores anyway)
+        now = int(time.time())
         token_payload = {
             "sub": str(user_data.get("pk", user_data.get("sub", ""))),
             "email": user_data.get("email", ""),
             "name": user_data.get("name", ""),
             "preferred_username": user_data.get("username", user_data.get("preferred_username", "")),
-            "exp": datetime.utcnow() + timedelta(hours=self.TOKEN_EXPIRY_HOURS),
-            "iat": datetime.utcnow(),
+            "exp": now + self.TOKEN_EXPIRY_HOURS * 3600,
+            "iat": now,
         }
-        return jwt.encode(token_payload, self.client_id, algorithm="HS256")
+        return jwt.encode(token_payload, self._jwt_key, algorithm="HS256")
 
     async def login(self, username: str, password: str) -> AuthResult:
         """
@@ -105,64 +228,54 @@ class AuthentikService:
             MFARequiredError: MFA required but not supported
             ServiceUnavailableError: Authentik unavailable
         """
-        logger.debug(f"Authenticating user: {username}")
+        logger.debug("Authenticating user: %s", username)
 
         try:
-            async with httpx.AsyncClient(
-                timeout=self.TIMEOUT_SECONDS,
-                follow_redirects=True,
-                cookies=httpx.Cookies()
-            ) as client:
-                # Step 1: Initialize the authentication flow
-                flow_init = await client.get(
-                    f"{self.base_url}/api/v3/flows/executor/default-authentication-flow/",
-                    params={"query": ""},
-                )
-
-                if flow_init.status_code != 200:
-                    logger.error(f"Auth flow init failed | status={flow_init.status_code}")
-                    raise ServiceUnavailableError()
-
-                flow_data = flow_init.json()
-                component = flow_data.get("component", "ak-stage-identification")
-                logger.debug(f"Auth flow component: {component}")
-
-                # Step 2: Submit credentials based on the flow stage
-                if component == "ak-stage-identification":
-                    submit_response = await client.post(
-                        f"{self.base_url}/api/v3/flows/executor/default-authentication-flow/",
-                        json={
-                            "component": "ak-stage-identification",
-                            "uid_field": username,
-                            "password": password,
-                        },
-                        params={"query": ""},
+            async with self._http_client() as client:
+                # Step 1: Submit the credentials straight to the identification stage,
+                # skipping the discovery GET, unless a recent login found that this flow
+                # needs it. That only changes when Authentik is reconfigured.
+                response_data = None
+                if self._flow_components.get(self.AUTH_FLOW_SLUG) != self.FLOW_INIT_REQUIRED:
+                    response_data = await self._submit_credentials(
+                        client, self.DEFAULT_FIRST_STAGE, username, password
                     )
-                    response_data = submit_response.json()
-
-                    # If identification stage passes to password stage
-                    if response_data.get("component") == "ak-stage-password":
-                        logger.debug("Proceeding to password stage")
-                        submit_response = await client.post(
-                            f"{self.base_url}/api/v3/flows/executor/default-authentication-flow/",
-                            json={
-                                "component": "ak-stage-password",
-                                "password": password,
-                            },
-                            params={"query": ""},
-                        )
-                        response_data = submit_response.json()
-                else:
-                    response_data = flow_data
+                    if (
+                        response_data.get("component") == "ak-stage-identification"
+                        and "response_errors" not in response_data
+                    ):
+                        # The flow was not ready for credentials; ask Authentik, and
+                        # have logins for the cache TTL do so first
+                        self._flow_components[self.AUTH_FLOW_SLUG] = self.FLOW_INIT_REQUIRED
+                        response_data = None
+
+                if response_data is None:
+                    flow_init = await client.get(self.auth_flow_url, params=self.FLOW_QUERY_PARAMS)
+
+                    if flow_init.status_code != 200:
+                        logger.error("Auth flow init failed | status=%d", flow_init.status_code)
+                        raise ServiceUnavailableError()
+
+                    flow_data = orjson.loads(flow_init.content)
+                    component = flow_data.get("component", self.DEFAULT_FIRST_STAGE)
+                    logger.debug("Auth flow component: %s", component)
+
+                    # Step 2: Retry against the stage Authentik reported
+                    if component in self.CREDENTIAL_STAGES:
+                        response_data = await self._submit_credentials(client, component, username, password)
+                    else:
+                        response_data = flow_data
+
+                component = response_data.get("component")
+                errors = response_data.get("response_errors")
 
                 # Check for errors
-                if response_data.get("component") == "ak-stage-access-denied":
-                    logger.warning(f"Login denied | username={username}")
+                if component == "ak-stage-access-denied":
+                    logger.warning("Login denied | username=%s", username)
                     raise AuthenticationError()
 
-                if "response_errors" in response_data:
-                    errors = response_data.get("response_errors", {})
-                    logger.warning(f"Login errors | username={username} | errors={errors}")
+                if errors is not None:
+                    logger.warning("Login errors | username=%s | errors=%s", username, errors)
                     if "non_field_errors" in errors:
                         error_list = errors["non_field_errors"]
                         if error_list:
@@ -172,21 +285,19 @@ class AuthentikService:
                     raise AuthenticationError()
 
                 # Check if MFA is required
-                if response_data.get("component") in ["ak-stage-authenticator-validate", "ak-stage-authenticator-totp"]:
-                    logger.warning(f"MFA required | username={username}")
+                if component in self.MFA_STAGES:
+                    logger.warning("MFA required | username=%s", username)
                     raise MFARequiredError()
 
                 # Check for successful redirect (login complete)
-                if response_data.get("type") == "redirect" or response_data.get("component") == "xak-flow-redirect":
-                    me_response = await client.get(
-                        f"{self.base_url}/api/v3/core/users/me/",
-                    )
+                if component == "xak-flow-redirect" or response_data.get("type") == "redirect":
+                    me_response = await client.get(self.current_user_url)
 
                     if me_response.status_code == 200:
-                        user_data = me_response.json().get("user", {})
+                        user_data = orjson.loads(me_response.content).get("user", {})
                         access_token = self._create_app_token(user_data)
 
-                        logger.info(f"Login successful | username={username} | user_id={user_data.get('pk')}")
+                        logger.info("Login successful | username=%s | user_id=%s", username, user_data.get("pk"))
 
                         return AuthResult(
                             access_token=access_token,
@@ -198,19 +309,19 @@ class AuthentikService:
                             ),
                         )
 
-                logger.warning(f"Login failed - unexpected response | username={username}")
+                logger.warning("Login failed - unexpected response | username=%s", username)
                 raise AuthenticationError()
 
         except httpx.TimeoutException:
-            logger.error(f"Auth service timeout | username={username}")
+            logger.error("Auth service timeout | username=%s", username)
             raise ServiceUnavailableError("Authentication service is temporarily unavailable")
         except httpx.RequestError as e:
-            logger.error(f"Auth service connection error | username={username} | error={str(e)}")
+            logger.error("Auth service connection error | username=%s | error=%s", username, e)
             raise ServiceUnavailableError("Unable to connect to authentication service")
         except AuthentikServiceError:
             raise
         except Exception as e:
-            logger.error(f"Unexpected login error | username={username} | error={str(e)}", exc_info=True)
+            logger.error("Unexpected login error | username=%s | error=%s", username, e, exc_info=True)
             raise AuthentikServiceError("An unexpected error occurred during login")
 
     async def signup(self, username: str, email: str, password: str) -> str:
@@ -230,55 +341,60 @@ class AuthentikService:
             RegistrationError: Invalid registration data
             ServiceUnavailableError: Authentik unavailable
         """
-        logger.debug(f"Registering user: {username}")
+        logger.debug("Registering user: %s", username)
 
         try:
-            async with httpx.AsyncClient(
-                timeout=self.TIMEOUT_SECONDS,
-                follow_redirects=True,
-                cookies=httpx.Cookies()
-            ) as client:
-                # Step 1: Initialize the enrollment flow
-                flow_init = await client.get(
-                    f"{self.base_url}/api/v3/flows/executor/newsfeed-enrollment/",
-                    params={"query": ""},
-                )
+            async with self._http_client() as client:
+                # Step 1: Initialize the enrollment flow, unless a recent signup already
+                # told us which stage it starts at (Authentik plans the flow on the POST)
+                flow_component = self._flow_components.get(self.ENROLLMENT_FLOW_SLUG)
+                if flow_component is None:
+                    flow_init = await client.get(
+                        self.enrollment_flow_url,
+                        params=self.FLOW_QUERY_PARAMS,
+                    )
+
+                    if flow_init.status_code == 404:
+                        logger.error("Enrollment flow not found")
+                        raise ServiceUnavailableError("User registration is not configured")
 
-                if flow_init.status_code == 404:
-                    logger.error("Enrollment flow not found")
-                    raise ServiceUnavailableError("User registration is not configured")
+                    if flow_init.status_code != 200:
+                        logger.error("Enrollment init failed | status=%d", flow_init.status_code)
+                        raise ServiceUnavailableError("Registration service unavailable")
 
-                if flow_init.status_code != 200:
-                    logger.error(f"Enrollment init failed | status={flow_init.status_code}")
-                    raise ServiceUnavailableError("Registration service unavailable")
+                    flow_data = orjson.loads(flow_init.content)
+                    flow_component = flow_data.get("component", "ak-stage-prompt")
+                    logger.debug("Enrollment flow component: %s", flow_component)
 
-                flow_data = flow_init.json()
-                logger.debug(f"Enrollment flow component: {flow_data.get('component')}")
+                    # Check if access is denied immediately
+                    if flow_component == "ak-stage-access-denied":
+                        logger.warning("Registration disabled")
+                        raise RegistrationError("Registration is currently disabled", status_code=403)
 
-                # Check if access is denied immediately
-                if flow_data.get("component") == "ak-stage-access-denied":
-                    logger.warning("Registration disabled")
-                    raise RegistrationError("Registration is currently disabled", status_code=403)
+                    self._flow_components[self.ENROLLMENT_FLOW_SLUG] = flow_component
 
                 # Step 2: Submit user registration data
                 register_response = await client.post(
-                    f"{self.base_url}/api/v3/flows/executor/newsfeed-enrollment/",
-                    json={
-                        "component": flow_data.get("component", "ak-stage-prompt"),
+                    self.enrollment_flow_url,
+                    content=orjson.dumps({
+                        "component": flow_component,
                         "username": username,
                         "email": email,
                         "password": password,
                         "password_repeat": password,
-                    },
-                    params={"query": ""},
+                    }),
+                    headers=self.JSON_HEADERS,
+                    params=self.FLOW_QUERY_PARAMS,
                 )
 
-                response_data = register_response.json()
+                response_data = orjson.loads(register_response.content)
+
+                component = response_data.get("component")
+                errors = response_data.get("response_errors")
 
                 # Check for validation errors
-                if "response_errors" in response_data:
-                    errors = response_data.get("response_errors", {})
-                    logger.warning(f"Signup validation errors | username={username} | errors={errors}")
+                if errors is not None:
+                    logger.warning("Signup validation errors | username=%s | errors=%s", username, errors)
 
                     if "username" in errors:
                         error_list = errors["username"]
@@ -303,32 +419,34 @@ class AuthentikService:
                     raise RegistrationError("Invalid registration data")
 
                 # Check for access denied (can also indicate duplicate user)
-                if response_data.get("component") == "ak-stage-access-denied":
+                if component == "ak-stage-access-denied":
                     error_msg = response_data.get("error_message", "")
-                    logger.warning(f"Signup access denied | username={username} | error={error_msg}")
-                    if "update user" in error_msg.lower() or "already" in error_msg.lower():
+                    logger.warning("Signup access denied | username=%s | error=%s", username, error_msg)
+                    error_msg_lower = error_msg.lower()
+                    if "update user" in error_msg_lower or "already" in error_msg_lower:
                         raise ConflictError("Username or email is already taken")
                     raise RegistrationError(error_msg or "Registration is currently disabled", status_code=403)
 
                 # Success - flow completed (redirect)
-                if response_data.get("type") == "redirect" or response_data.get("component") == "xak-flow-redirect":
-                    logger.info(f"Signup successful | username={username} | email={email}")
+                if component == "xak-flow-redirect" or response_data.get("type") == "redirect":
+                    logger.info("Signup successful | username=%s | email=%s", username, email)
                     return "Account created successfully. You can now log in."
 
-                # Unexpected state
-                logger.error(f"Signup incomplete | username={username} | response={response_data}")
+                # Unexpected state; the flow may have changed, so rediscover it next time
+                self._flow_components.pop(self.ENROLLMENT_FLOW_SLUG, None)
+                logger.error("Signup incomplete | username=%s | response=%s", username, response_data)
                 raise RegistrationError("Registration process incomplete")
 
         except httpx.TimeoutException:
-            logger.error(f"Registration service timeout | username={username}")
+            logger.error("Registration service timeout | username=%s", username)
             raise ServiceUnavailableError("Registration service is temporarily unavailable")
         except httpx.RequestError as e:
-            logger.error(f"Registration service connection error | username={username} | error={str(e)}")
+            logger.error("Registration service connection error | username=%s | error=%s", username, e)
             raise ServiceUnavailableError("Unable to connect to registration service")
         except AuthentikServiceError:
             raise
         except Exception as e:
-            logger.error(f"Unexpected signup error | username={username} | error={str(e)}", exc_info=True)
+            logger.error("Unexpected signup error | username=%s | error=%s", username, e, exc_info=True)
             raise AuthentikServiceError("An unexpected error occurred during registration")
 
     async def logout(self, token: Optional[str] = None) -> None:
@@ -345,17 +463,21 @@ class AuthentikService:
         logger.debug("Attempting token revocation")
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                await client.post(
-                    f"{self.base_url}/application/o/revoke/",
-                    data={
-                        "token": token,
-                        "client_id": self.client_id,
-                    },
-                    headers={"Content-Type": "application/x-www-form-urlencoded"},
-                )
-                logger.debug("Token revocation sent")
+            await self.client.post(
+                self.revoke_url,
+                data={
+                    "token": token,
+                    "client_id": self.client_id,
+                },
+                timeout=self.REVOKE_TIMEOUT_SECONDS,
+            )
+            logger.debug("Token revocation sent")
         except Exception as e:
             # Token revocation is best-effort, don't fail logout
-            logger.debug(f"Token revocation failed (non-critical): {str(e)}")
+            logger.debug("Token revocation failed (non-critical): %s", e)
+
 
+@lru_cache()
+def get_authentik_service() -> AuthentikService:
+    """Get the shared AuthentikService instance."""
+    return AuthentikService()
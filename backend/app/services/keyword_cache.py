@@ -0,0 +1,51 @@
+"""In-process caches of each user's saved keywords."""
+
+import itertools
+from typing import Optional
+
+from cachetools import TTLCache
+
+# Keywords change rarely and every mutation in this process invalidates the entry;
+# the TTL bounds how long other workers can serve a stale list.
+KEYWORD_CACHE_TTL_SECONDS = 60
+KEYWORD_CACHE_MAX_USERS = 10_000
+
+keyword_cache: TTLCache = TTLCache(
+    maxsize=KEYWORD_CACHE_MAX_USERS,
+    ttl=KEYWORD_CACHE_TTL_SECONDS,
+)
+
+# Serialized GET /api/keywords response bodies, so page loads skip the query and
+# the per-row model validation entirely
+keyword_list_cache: TTLCache = TTLCache(
+    maxsize=KEYWORD_CACHE_MAX_USERS,
+    ttl=KEYWORD_CACHE_TTL_SECONDS,
+)
+
+# Each invalidation stamps the user with a new, never reused number. A reader notes
+# the stamp before querying and only caches its result if the stamp is unchanged,
+# so a query that raced a keyword change cannot put the old list back in the cache.
+# Stamps only need to outlive a query, so they expire with the cached lists.
+_generations: TTLCache = TTLCache(
+    maxsize=KEYWORD_CACHE_MAX_USERS,
+    ttl=KEYWORD_CACHE_TTL_SECONDS,
+)
+_generation_counter = itertools.count(1)
+
+
+def keyword_generation(user_id: str) -> Optional[int]:
+    """Current invalidation stamp for a user; read it before loading their keywords."""
+    return _generations.get(user_id)
+
+
+def cache_if_unchanged(cache: TTLCache, user_id: str, generation: Optional[int], value) -> None:
+    """Cache a value loaded at `generation`, unless the user's keywords changed since."""
+    if _generations.get(user_id) == generation:
+        cache[user_id] = value
+
+
+def invalidate_user_keywords(user_id: str) -> None:
+    """Drop the cached keywords for a user after they change."""
+    _generations[user_id] = next(_generation_counter)
+    keyword_cache.pop(user_id, None)
+    keyword_list_cache.pop(user_id, None)
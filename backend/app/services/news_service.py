@@ -1,6 +1,15 @@
+import asyncio
+import hashlib
 import httpx
-from datetime import datetime, timedelta
+import itertools
+import orjson
+import time
+import redis.asyncio as redis
+from cachetools import TTLCache
+from datetime import datetime
+from functools import lru_cache
 from typing import Optional
+from pydantic import ValidationError
 
 from app.config import get_settings
 from app.schemas.article import Article, ArticleList, ArticleSource
@@ -13,9 +22,168 @@ logger = get_logger(__name__)
 class NewsService:
     """Service for fetching news from News API."""
 
-    def __init__(self):
+    TIMEOUT_SECONDS = 15.0
+    MAX_CONNECTIONS = 64
+    MAX_KEEPALIVE_CONNECTIONS = 32
+    KEEPALIVE_EXPIRY_SECONDS = 30.0
+    # News API results only change every few minutes; users re-poll the same keywords
+    CACHE_TTL_SECONDS = 180
+    CACHE_MAX_ENTRIES = 512
+    # Shared Redis cache (when configured): "latest" results go stale quickly,
+    # relevancy/popularity rankings barely move; empty results are kept briefly
+    REDIS_KEY_PREFIX = "news"
+    REDIS_TTL_SECONDS = {"publishedAt": 120, "relevancy": 600, "popularity": 600}
+    REDIS_EMPTY_TTL_SECONDS = 30
+    # A slow cache must not cost more than the fetch it saves
+    REDIS_TIMEOUT_SECONDS = 0.5
+    SEARCH_WINDOW_SECONDS = 30 * 24 * 3600
+    # News API rejects q longer than 500 characters; longer OR searches are split
+    # into chunks that are fetched concurrently and merged
+    MAX_QUERY_LENGTH = 450
+    MAX_CONCURRENT_CHUNKS = 8
+    # Split searches page through each chunk's leading results; News API returns at
+    # most this many per request, so deeper pages of a split search come back empty
+    MAX_CHUNK_RESULTS = 100
+    # Gateway errors (5xx) are usually transient and searches are idempotent GETs, so
+    # retry them with exponential backoff or the server's Retry-After. A 429 usually
+    # means the daily quota is spent, so it is only retried when Retry-After is short.
+    # One fetch (all of its chunks together) gets a shared number of retries and a
+    # time budget, so callers waiting on it are not held up for long.
+    MAX_RETRIES = 3
+    RETRY_BUDGET_SECONDS = 3.0
+    RETRY_BASE_DELAY_SECONDS = 0.5
+    RETRY_MAX_DELAY_SECONDS = 2.0
+    RATE_LIMIT_MAX_RETRY_AFTER_SECONDS = 2.0
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
         self.api_key = settings.news_api_key
+        # Query parameters shared by every search
+        self._base_params = {"apiKey": self.api_key}
         self.base_url = settings.news_api_base_url
+        # Custom transport for the News API client (e.g. httpx.MockTransport in tests)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self.redis_url = settings.redis_url
+        self._redis: Optional[redis.Redis] = None
+        self._cache: TTLCache = TTLCache(maxsize=self.CACHE_MAX_ENTRIES, ttl=self.CACHE_TTL_SECONDS)
+        # Fetches in flight, keyed like the cache
+        self._pending: dict[tuple, asyncio.Task] = {}
+        # (UTC day number, formatted search window start) for the current day
+        self._from_date: tuple[int, str] = (-1, "")
+        # Caps chunked requests in flight to News API across all searches
+        self._chunk_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_CHUNKS)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Lazy initialization of the HTTP client, reused to keep connections alive.
+        HTTP/2 lets concurrent searches share one TLS connection to News API.
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                transport=self._transport,
+                http2=True,
+                timeout=self.TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=self.MAX_CONNECTIONS,
+                    max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=self.KEEPALIVE_EXPIRY_SECONDS,
+                ),
+            )
+        return self._client
+
+    @property
+    def redis(self) -> Optional[redis.Redis]:
+        """Lazy initialization of the shared Redis cache; None when not configured."""
+        if self._redis is None and self.redis_url:
+            self._redis = redis.from_url(
+                self.redis_url,
+                socket_timeout=self.REDIS_TIMEOUT_SECONDS,
+                socket_connect_timeout=self.REDIS_TIMEOUT_SECONDS,
+            )
+        return self._redis
+
+    async def aclose(self) -> None:
+        """Close pooled connections to News API and Redis."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    def _search_from_date(self) -> str:
+        """Start of the search window as YYYY-MM-DD, formatted once per UTC day."""
+        now = time.time()
+        day = int(now // 86400)
+        if self._from_date[0] != day:
+            from_date = time.strftime("%Y-%m-%d", time.gmtime(now - self.SEARCH_WINDOW_SECONDS))
+            self._from_date = (day, from_date)
+        return self._from_date[1]
+
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> Optional[float]:
+        """
+        Seconds to wait before retrying a failed search, or None if it should not be
+        retried. Uses Retry-After when given in seconds, else exponential backoff.
+        """
+        status_code = response.status_code
+        if status_code != 429 and status_code < 500:
+            return None
+        retry_after = _retry_after_seconds(response)
+        if status_code == 429:
+            # Quota exhaustion: retrying would only spend more of it
+            if retry_after is None or retry_after > self.RATE_LIMIT_MAX_RETRY_AFTER_SECONDS:
+                return None
+            return retry_after
+        if retry_after is None:
+            retry_after = self.RETRY_BASE_DELAY_SECONDS * 2 ** attempt
+        return min(retry_after, self.RETRY_MAX_DELAY_SECONDS)
+
+    async def _sleep(self, seconds: float) -> None:
+        """Wait before a retry; its own method so tests can skip the wait."""
+        await asyncio.sleep(seconds)
+
+    def _redis_key(self, cache_key: tuple) -> str:
+        """Build the Redis key for a local cache key: news:{lang}:{sort}:{mode}:{page}:{size}:{digest}."""
+        keywords, page, page_size, sort_by, language, match_mode = cache_key
+        digest = hashlib.sha1("\x1f".join(keywords).encode("utf-8")).hexdigest()
+        return f"{self.REDIS_KEY_PREFIX}:{language}:{sort_by}:{match_mode}:{page}:{page_size}:{digest}"
+
+    async def _redis_get(self, key: str) -> Optional[ArticleList]:
+        """Read a cached result from Redis; cache outages are treated as misses."""
+        if self.redis is None:
+            return None
+        try:
+            cached = await self.redis.get(key)
+        except redis.RedisError as e:
+            logger.warning("News cache read failed | error=%s", e)
+            return None
+        if cached is None:
+            return None
+        try:
+            return ArticleList.model_validate_json(cached)
+        except ValidationError as e:
+            # Corrupt or written by an older schema; drop it and fetch afresh
+            logger.warning("News cache entry unreadable, discarding | key=%s | error=%s", key, e)
+            try:
+                await self.redis.delete(key)
+            except redis.RedisError:
+                pass
+            return None
+
+    async def _redis_set(self, key: str, result: ArticleList, sort_by: str) -> None:
+        """Store a result in Redis; failures only cost a future cache miss."""
+        if self.redis is None:
+            return
+        if result.articles:
+            ttl = self.REDIS_TTL_SECONDS.get(sort_by, self.CACHE_TTL_SECONDS)
+        else:
+            ttl = self.REDIS_EMPTY_TTL_SECONDS
+        try:
+            await self.redis.set(key, result.model_dump_json(), ex=ttl)
+        except redis.RedisError as e:
+            logger.warning("News cache write failed | error=%s", e)
 
     async def fetch_articles(
         self,
@@ -48,6 +216,43 @@ class NewsService:
             logger.error("NEWS_API_KEY is not configured")
             raise ValueError("NEWS_API_KEY is not configured")
         
+        # Keyword order does not change the results, so it is not part of the key
+        cache_key = (tuple(sorted(keywords)), page, page_size, sort_by, language, match_mode)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            logger.debug("News API cache hit | keywords=%d | page=%d", len(keywords), page)
+            return cached
+        
+        task = self._pending.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_uncached(
+                cache_key, keywords, page, page_size, sort_by, language, match_mode
+            ))
+            self._pending[cache_key] = task
+            task.add_done_callback(lambda _: self._pending.pop(cache_key, None))
+        # Concurrent identical requests share one fetch; shielded so one caller
+        # disconnecting does not cancel it for the others
+        return await asyncio.shield(task)
+
+    async def _fetch_uncached(
+        self,
+        cache_key: tuple,
+        keywords: list[str],
+        page: int,
+        page_size: int,
+        sort_by: str,
+        language: str,
+        match_mode: str,
+    ) -> ArticleList:
+        """Fetch articles on a local cache miss, from Redis or else News API."""
+        # Then the cache shared with other workers
+        redis_key = self._redis_key(cache_key)
+        cached = await self._redis_get(redis_key)
+        if cached is not None:
+            logger.debug("News API shared cache hit | keywords=%d | page=%d", len(keywords), page)
+            self._cache[cache_key] = cached
+            return cached
+        
         # Build query based on match mode
         if match_mode == "all":
             # AND - articles must contain all keywords (stricter)
@@ -56,85 +261,185 @@ class NewsService:
             # OR - articles can contain any keyword (broader, default)
             query = " OR ".join(keywords)
         
-        # Search articles from the last 30 days (News API free tier limitation)
-        from_date = (datetime.utcnow() - timedelta(days=30)).strftime("%Y-%m-%d")
-        
-        params = {
+        budget = _RetryBudget(self.MAX_RETRIES, self.RETRY_BUDGET_SECONDS)
+        if match_mode != "all" and len(query) > self.MAX_QUERY_LENGTH:
+            result = await self._fetch_chunked(keywords, page, page_size, sort_by, language, budget)
+        else:
+            result = await self._request_articles(query, page, page_size, sort_by, language, budget)
+        self._cache[cache_key] = result
+        await self._redis_set(redis_key, result, sort_by)
+        return result
+
+    async def _fetch_chunked(
+        self,
+        keywords: list[str],
+        page: int,
+        page_size: int,
+        sort_by: str,
+        language: str,
+        budget: "_RetryBudget",
+    ) -> ArticleList:
+        """
+        Run an OR search that is too long for one query as several concurrent
+        queries. Every result up to the end of the requested page is fetched from
+        each chunk, merged without duplicates, and the requested page sliced out,
+        so pages line up as they would for a single query.
+        """
+        chunks = _split_by_query_length(keywords, self.MAX_QUERY_LENGTH)
+        depth = min(page * page_size, self.MAX_CHUNK_RESULTS)
+        logger.debug(
+            "News API query split | keywords=%d | chunks=%d | depth=%d",
+            len(keywords), len(chunks), depth,
+        )
+
+        async def fetch_chunk(chunk: list[str]) -> ArticleList:
+            async with self._chunk_semaphore:
+                return await self._request_articles(
+                    " OR ".join(chunk), 1, depth, sort_by, language, budget
+                )
+
+        results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+
+        # Relevancy and popularity scores are not returned by News API, so those
+        # orders are merged by rank (each chunk's first, then each chunk's second...);
+        # recency is re-established exactly
+        seen: set[str] = set()
+        articles = []
+        for ranked in itertools.zip_longest(*(result.articles for result in results)):
+            for article in ranked:
+                if article is not None and article.url not in seen:
+                    seen.add(article.url)
+                    articles.append(article)
+        if sort_by == "publishedAt":
+            articles.sort(key=_published_at_sort_key, reverse=True)
+        start = (page - 1) * page_size
+        return ArticleList(
+            articles=articles[start:start + page_size],
+            # Distinct articles fetched, plus what the chunks reported beyond them
+            # (which can still overlap)
+            totalResults=len(articles) + sum(
+                max(result.totalResults - len(result.articles), 0) for result in results
+            ),
+        )
+
+    async def _request_articles(
+        self,
+        query: str,
+        page: int,
+        page_size: int,
+        sort_by: str,
+        language: str,
+        budget: "_RetryBudget",
+    ) -> ArticleList:
+        """
+        Run a single News API search and parse the articles it returns. Transient
+        errors are retried while the fetch's retry budget lasts.
+        """
+        params = self._base_params | {
             "q": query,
-            "from": from_date,
+            # Search articles from the last 30 days (News API free tier limitation)
+            "from": self._search_from_date(),
             "sortBy": sort_by,
             "page": page,
             "pageSize": min(page_size, 100),
-            "apiKey": self.api_key,
             "language": language,
         }
         
         logger.debug(
-            f"News API request | query={query} | sort={sort_by} | "
-            f"lang={language} | page={page} | mode={match_mode}"
+            "News API request | query=%s | sort=%s | lang=%s | page=%d",
+            query, sort_by, language, page,
         )
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/everything",
+            timeout = self.TIMEOUT_SECONDS
+            attempt = 0
+            while True:
+                response = await self.client.get(
+                    "/everything",
                     params=params,
-                    timeout=15.0,
-                )
-                
-                if response.status_code != 200:
-                    error_data = response.json()
-                    error_msg = error_data.get('message', 'Unknown error')
-                    logger.error(f"News API error | status={response.status_code} | error={error_msg}")
-                    raise Exception(f"News API error: {error_msg}")
-                
-                data = response.json()
-                
-                # Filter out articles with missing required fields (title, url)
-                articles = []
-                skipped = 0
-                for art in data.get("articles", []):
-                    title = art.get("title")
-                    url = art.get("url")
-                    # Skip articles without title or url
-                    if not title or not url:
-                        skipped += 1
-                        continue
-                    articles.append(Article(
-                        source=ArticleSource(
-                            id=art.get("source", {}).get("id"),
-                            name=art.get("source", {}).get("name"),
-                        ),
-                        author=art.get("author"),
-                        title=title,
-                        description=art.get("description"),
-                        url=url,
-                        urlToImage=art.get("urlToImage"),
-                        publishedAt=art.get("publishedAt"),
-                        content=art.get("content"),
-                    ))
-                
-                total_results = data.get("totalResults", 0)
-                
-                if skipped > 0:
-                    logger.debug(f"Skipped {skipped} articles with missing title/url")
-                
-                logger.info(
-                    f"News API response | articles={len(articles)} | "
-                    f"total={total_results} | query={query[:50]}..."
+                    timeout=timeout,
                 )
-                
-                return ArticleList(
-                    articles=articles,
-                    totalResults=total_results,
-                    status=data.get("status", "ok"),
+                delay = self._retry_delay(response, attempt)
+                if delay is None:
+                    break
+                remaining = budget.deadline - time.monotonic()
+                if budget.retries <= 0 or delay >= remaining:
+                    logger.warning(
+                        "News API retry budget exhausted | status=%d | attempts=%d",
+                        response.status_code, attempt + 1,
+                    )
+                    break
+                budget.retries -= 1
+                attempt += 1
+                logger.warning(
+                    "News API transient error, retrying | status=%d | attempt=%d | delay=%.1fs",
+                    response.status_code, attempt, delay,
                 )
-                
+                await self._sleep(delay)
+                # A retry must also finish within the budget
+                timeout = min(self.TIMEOUT_SECONDS, remaining - delay)
+            
+            if response.status_code != 200:
+                try:
+                    error_data = orjson.loads(response.content)
+                except orjson.JSONDecodeError:
+                    # Gateways in front of News API can answer with HTML
+                    error_data = {}
+                error_msg = error_data.get("message", "Unknown error")
+                logger.error("News API error | status=%d | error=%s", response.status_code, error_msg)
+                raise Exception(f"News API error: {error_msg}")
+            
+            # Parse the (up to 100 article) payload with orjson's C parser straight from bytes
+            data = orjson.loads(response.content)
+            
+            # Filter out articles with missing required fields (title, url). The payload
+            # is already typed JSON, so models are constructed without per-field
+            # validation; only publishedAt needs converting.
+            articles = []
+            skipped = 0
+            for art in data.get("articles", []):
+                title = art.get("title")
+                url = art.get("url")
+                # Skip articles without title or url
+                if not title or not url:
+                    skipped += 1
+                    continue
+                source = art.get("source") or {}
+                articles.append(Article.model_construct(
+                    source=ArticleSource.model_construct(
+                        id=source.get("id"),
+                        name=source.get("name"),
+                    ),
+                    author=art.get("author"),
+                    title=title,
+                    description=art.get("description"),
+                    url=url,
+                    urlToImage=art.get("urlToImage"),
+                    publishedAt=_parse_published_at(art.get("publishedAt")),
+                    content=art.get("content"),
+                ))
+            
+            total_results = data.get("totalResults", 0)
+            
+            if skipped > 0:
+                logger.debug("Skipped %d articles with missing title/url", skipped)
+            
+            logger.info(
+                "News API response | articles=%d | total=%d | query=%.50s...",
+                len(articles), total_results, query,
+            )
+            
+            return ArticleList(
+                articles=articles,
+                totalResults=total_results,
+                status=data.get("status", "ok"),
+            )
+            
         except httpx.TimeoutException:
-            logger.error(f"News API timeout | query={query[:50]}...")
+            logger.error("News API timeout | query=%.50s...", query)
             raise Exception("News API request timed out")
         except httpx.RequestError as e:
-            logger.error(f"News API connection error | error={str(e)}")
+            logger.error("News API connection error | error=%s", e)
             raise Exception(f"Failed to connect to News API: {str(e)}")
 
     async def get_article_by_url(self, url: str) -> Optional[Article]:
@@ -146,3 +451,61 @@ class NewsService:
         # For detail view, frontend can use the URL directly
         # This is a placeholder if we need to fetch more data
         return None
+
+
+def _parse_published_at(value: Optional[str]) -> Optional[datetime]:
+    """Parse News API's ISO 8601 timestamps (e.g. 2024-01-15T10:00:00Z)."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _split_by_query_length(keywords: list[str], max_chars: int) -> list[list[str]]:
+    """Group keywords so each group's OR query stays within max_chars."""
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    length = 0
+    for keyword in keywords:
+        added = len(keyword) + (len(" OR ") if current else 0)
+        if current and length + added > max_chars:
+            chunks.append(current)
+            current, length = [], 0
+            added = len(keyword)
+        current.append(keyword)
+        length += added
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class _RetryBudget:
+    """Retries and time left for one fetch, shared by all of its chunked requests."""
+
+    def __init__(self, retries: int, seconds: float):
+        self.retries = retries
+        self.deadline = time.monotonic() + seconds
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """The response's Retry-After in seconds, or None if missing or an HTTP date."""
+    retry_after = response.headers.get("Retry-After")
+    if not retry_after:
+        return None
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        return None
+
+
+def _published_at_sort_key(article: Article) -> float:
+    """Sort key for newest-first merging; undated articles sort last."""
+    return article.publishedAt.timestamp() if article.publishedAt is not None else float("-inf")
+
+
+@lru_cache()
+def get_news_service() -> NewsService:
+    """Get the shared NewsService instance."""
+    return NewsService()
@@ -1,7 +1,13 @@
 """Service for AI-powered article summarization using OpenAI."""
 
-from typing import List
-from openai import OpenAI, AuthenticationError, RateLimitError, APIError, APITimeoutError
+import asyncio
+import hashlib
+import orjson
+from cachetools import TTLCache
+from functools import lru_cache
+from typing import AsyncIterator, List
+import redis.asyncio as redis
+from openai import AsyncOpenAI, AuthenticationError, RateLimitError, APIError, APITimeoutError
 
 from app.config import get_settings
 from app.logging_config import get_logger
@@ -47,10 +53,32 @@ class OpenAIService:
 
     TIMEOUT_SECONDS = 30.0
     MODEL = "gpt-4o-mini"
+    ARTICLE_TEMPLATE = "**%s**\nSource: %s\nDescription: %s"
+    # Per-article caps on prompt text; a summary needs the gist, not the full blurb
+    MAX_PROMPT_TITLE_CHARS = 160
+    MAX_PROMPT_DESCRIPTION_CHARS = 240
+    # The instructions only vary by article count; the formatted header is cached per count
+    PROMPT_HEADER_TEMPLATE = """You are a news analyst. Summarize the following %d news articles into a concise, informative summary. 
+Highlight the main themes, key events, and important takeaways. Keep the summary to 2-3 paragraphs.
+
+Articles:
+"""
+    PROMPT_FOOTER = "\n\nSummary:"
+    # Dashboard reloads ask for the same article set again; the summary is reusable
+    CACHE_TTL_SECONDS = 3600
+    CACHE_MAX_ENTRIES = 1024
+    # Shared with other workers through Redis when REDIS_URL is set
+    REDIS_KEY_PREFIX = "openai:sum"
+    REDIS_TIMEOUT_SECONDS = 0.5
 
     def __init__(self):
         self.api_key = settings.openai_api_key
         self._client = None
+        self.redis_url = settings.redis_url
+        self._redis: redis.Redis | None = None
+        self._cache: TTLCache = TTLCache(maxsize=self.CACHE_MAX_ENTRIES, ttl=self.CACHE_TTL_SECONDS)
+        # Summaries currently being generated, so concurrent duplicates share one call
+        self._pending: dict[str, asyncio.Task] = {}
 
     @property
     def is_enabled(self) -> bool:
@@ -58,7 +86,7 @@ class OpenAIService:
         return bool(self.api_key)
 
     @property
-    def client(self) -> OpenAI:
+    def client(self) -> AsyncOpenAI:
         """Lazy initialization of OpenAI client."""
         if self._client is None:
             if not self.api_key:
@@ -66,32 +94,69 @@ class OpenAIService:
                     "AI summarization requires an OpenAI API key. Add OPENAI_API_KEY to your .env file.",
                     status_code=503
                 )
-            self._client = OpenAI(
+            self._client = AsyncOpenAI(
                 api_key=self.api_key,
                 timeout=self.TIMEOUT_SECONDS,
             )
         return self._client
 
+    @property
+    def redis(self) -> redis.Redis | None:
+        """Lazy initialization of the shared Redis cache; None when not configured."""
+        if self._redis is None and self.redis_url:
+            self._redis = redis.from_url(
+                self.redis_url,
+                socket_timeout=self.REDIS_TIMEOUT_SECONDS,
+                socket_connect_timeout=self.REDIS_TIMEOUT_SECONDS,
+            )
+        return self._redis
+
+    async def aclose(self) -> None:
+        """Close pooled connections to OpenAI and Redis."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    @staticmethod
+    def _trim(text: str, limit: int) -> str:
+        """Shorten text to at most limit characters (plus an ellipsis), at a word boundary."""
+        if len(text) <= limit:
+            return text
+        cut = text.rfind(" ", 0, limit)
+        return text[:cut if cut > 0 else limit].rstrip() + "…"
+
     def _build_prompt(self, articles: List[dict]) -> str:
-        """Build the summarization prompt from articles."""
+        """
+        Build the summarization prompt from articles.
+        Titles and descriptions are trimmed, so with the 200-character source cap
+        each article adds at most about 650 characters on top of the instructions.
+        """
+        template = self.ARTICLE_TEMPLATE
+        trim = self._trim
         articles_text = "\n\n".join([
-            f"**{art.get('title', 'Untitled')}**\n"
-            f"Source: {art.get('source', 'Unknown')}\n"
-            f"Description: {art.get('description', 'No description')}"
+            template % (
+                trim(art.get("title") or "Untitled", self.MAX_PROMPT_TITLE_CHARS),
+                art.get("source") or "Unknown",
+                trim(art.get("description") or "No description", self.MAX_PROMPT_DESCRIPTION_CHARS),
+            )
             for art in articles
         ])
 
-        return f"""You are a news analyst. Summarize the following {len(articles)} news articles into a concise, informative summary. 
-Highlight the main themes, key events, and important takeaways. Keep the summary to 2-3 paragraphs.
-
-Articles:
-{articles_text}
+        return _prompt_header(len(articles)) + articles_text + self.PROMPT_FOOTER
 
-Summary:"""
+    @staticmethod
+    def _cache_key(articles: List[dict]) -> str:
+        """Hash the article content, ignoring the order the articles arrive in."""
+        content = orjson.dumps(sorted(articles, key=lambda art: art.get("title") or ""))
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
 
     async def summarize_articles(self, articles: List[dict]) -> str:
         """
         Summarize a list of articles using OpenAI's Responses API.
+        Summaries are cached by article content.
         
         Args:
             articles: List of article dicts with 'title', 'source', 'description' keys
@@ -105,34 +170,141 @@ Summary:"""
         if not articles:
             return "No articles to summarize."
 
+        cache_key = self._cache_key(articles)
+        summary = self._cache.get(cache_key)
+        if summary is not None:
+            logger.debug("OpenAI summary cache hit | articles=%d", len(articles))
+            return summary
+
+        task = self._pending.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._generate_summary(cache_key, articles))
+            self._pending[cache_key] = task
+            task.add_done_callback(lambda _: self._pending.pop(cache_key, None))
+        # Shielded so one caller disconnecting does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _redis_key(self, cache_key: str) -> str:
+        """Redis key for a summary; the model is part of it so upgrades start fresh."""
+        return f"{self.REDIS_KEY_PREFIX}:{self.MODEL}:{cache_key}"
+
+    async def _redis_get(self, cache_key: str) -> str | None:
+        """Read a summary another worker generated; cache outages are treated as misses."""
+        if self.redis is None:
+            return None
+        try:
+            cached = await self.redis.get(self._redis_key(cache_key))
+        except redis.RedisError as e:
+            logger.warning("Summary cache read failed | error=%s", e)
+            return None
+        return cached.decode("utf-8") if cached is not None else None
+
+    async def _redis_set(self, cache_key: str, summary: str) -> None:
+        """Share a summary with other workers; failures only cost a future cache miss."""
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(self._redis_key(cache_key), summary, ex=self.CACHE_TTL_SECONDS)
+        except redis.RedisError as e:
+            logger.warning("Summary cache write failed | error=%s", e)
+
+    async def _generate_summary(self, cache_key: str, articles: List[dict]) -> str:
+        """Call OpenAI for a summary (unless another worker has one) and cache it on success."""
+        summary = await self._redis_get(cache_key)
+        if summary is not None:
+            logger.debug("OpenAI summary shared cache hit | articles=%d", len(articles))
+            self._cache[cache_key] = summary
+            return summary
+
         prompt = self._build_prompt(articles)
         
-        logger.debug(f"OpenAI prompt length: {len(prompt)} characters")
+        logger.debug("OpenAI prompt length: %d characters", len(prompt))
 
         try:
-            response = self.client.responses.create(
+            # Awaited so the event loop keeps serving other requests during the LLM call
+            response = await self.client.responses.create(
                 model=self.MODEL,
                 input=prompt,
             )
             
             summary = response.output_text
-            logger.debug(f"OpenAI response length: {len(summary)} characters")
+            logger.debug("OpenAI response length: %d characters", len(summary))
             
-            return summary
+            self._cache[cache_key] = summary
+        except Exception as e:
+            raise self._translate_error(e)
+
+        await self._redis_set(cache_key, summary)
+        return summary
 
-        except APITimeoutError as e:
-            logger.error(f"OpenAI timeout | error={str(e)}")
-            raise OpenAITimeoutError()
-        except AuthenticationError as e:
-            logger.error(f"OpenAI auth error | error={str(e)}")
-            raise OpenAIAuthError()
-        except RateLimitError as e:
-            logger.warning(f"OpenAI rate limit | error={str(e)}")
-            raise OpenAIRateLimitError()
-        except APIError as e:
-            logger.error(f"OpenAI API error | error={str(e)}")
-            raise OpenAIAPIError(f"OpenAI service error: {str(e)}")
+    async def stream_summary(self, articles: List[dict]) -> AsyncIterator[str]:
+        """
+        Summarize articles, yielding the summary text as OpenAI generates it.
+        A cached summary is yielded in one piece; a completed stream is cached
+        like summarize_articles() results.
+        
+        Raises:
+            OpenAIServiceError: On any OpenAI-related error
+        """
+        if not articles:
+            yield "No articles to summarize."
+            return
+
+        cache_key = self._cache_key(articles)
+        summary = self._cache.get(cache_key)
+        if summary is None:
+            summary = await self._redis_get(cache_key)
+        if summary is not None:
+            logger.debug("OpenAI summary cache hit | articles=%d", len(articles))
+            yield summary
+            return
+
+        prompt = self._build_prompt(articles)
+        logger.debug("OpenAI prompt length: %d characters", len(prompt))
+
+        parts = []
+        try:
+            async with self.client.responses.stream(model=self.MODEL, input=prompt) as stream:
+                async for event in stream:
+                    if event.type == "response.output_text.delta":
+                        parts.append(event.delta)
+                        yield event.delta
         except Exception as e:
-            logger.error(f"Unexpected OpenAI error | error={str(e)}", exc_info=True)
-            raise OpenAIServiceError("Unable to connect to AI service. Please try again.")
+            raise self._translate_error(e)
+
+        summary = "".join(parts)
+        logger.debug("OpenAI response length: %d characters", len(summary))
+        self._cache[cache_key] = summary
+        await self._redis_set(cache_key, summary)
+
+    @staticmethod
+    def _translate_error(e: Exception) -> OpenAIServiceError:
+        """Log an error from an OpenAI call and map it to the service's error types."""
+        if isinstance(e, OpenAIServiceError):
+            return e
+        if isinstance(e, APITimeoutError):
+            logger.error("OpenAI timeout | error=%s", e)
+            return OpenAITimeoutError()
+        if isinstance(e, AuthenticationError):
+            logger.error("OpenAI auth error | error=%s", e)
+            return OpenAIAuthError()
+        if isinstance(e, RateLimitError):
+            logger.warning("OpenAI rate limit | error=%s", e)
+            return OpenAIRateLimitError()
+        if isinstance(e, APIError):
+            logger.error("OpenAI API error | error=%s", e)
+            return OpenAIAPIError(f"OpenAI service error: {str(e)}")
+        logger.error("Unexpected OpenAI error | error=%s", e, exc_info=e)
+        return OpenAIServiceError("Unable to connect to AI service. Please try again.")
+
+
+@lru_cache(maxsize=128)
+def _prompt_header(article_count: int) -> str:
+    """Prompt instructions for a given number of articles."""
+    return OpenAIService.PROMPT_HEADER_TEMPLATE % article_count
+
 
+@lru_cache()
+def get_openai_service() -> OpenAIService:
+    """Get the shared OpenAIService instance."""
+    return OpenAIService()
@@ -1,13 +1,19 @@
+import os
 import pytest
+from pytest_asyncio import is_async_test
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, String, TypeDecorator, CHAR
+from sqlalchemy import create_engine, event, String, TypeDecorator, CHAR
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
 import uuid
 
 from app.main import app
 from app.database import Base, get_db
+from app.models.keyword import UserKeyword
+from app.services.authentik_service import get_authentik_service
+from app.services.keyword_cache import keyword_cache, keyword_list_cache
 
 
 # Custom UUID type that works with both PostgreSQL and SQLite
@@ -42,47 +48,102 @@ class GUID(TypeDecorator):
 
 
 # Patch the model's UUID column to use our GUID type for tests
-from app.models import keyword
-original_uuid_type = keyword.UserKeyword.__table__.c.id.type
-keyword.UserKeyword.__table__.c.id.type = GUID()
+original_uuid_type = UserKeyword.__table__.c.id.type
+UserKeyword.__table__.c.id.type = GUID()
 
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# Create in-memory SQLite database for testing. A named shared-cache database lets
+# the sync engine (schema setup) and the app's async engine see the same tables.
+# Each pytest-xdist worker (`pytest -n auto`) gets its own database name.
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "main")
+SQLALCHEMY_DATABASE_URL = f"file:newsfeed_test_{XDIST_WORKER}?mode=memory&cache=shared&uri=true"
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
+    f"sqlite:///{SQLALCHEMY_DATABASE_URL}",
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# NullPool: each request opens its connection on the TestClient's current event loop
+async_engine = create_async_engine(
+    f"sqlite+aiosqlite:///{SQLALCHEMY_DATABASE_URL}",
+    poolclass=NullPool,
+)
+AsyncTestingSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, expire_on_commit=False
+)
 
-@pytest.fixture(scope="function")
-def db_session():
-    """Create a fresh database session for each test."""
+
+# The test database is throwaway, so skip SQLite's durability work. locking_mode is
+# left alone: EXCLUSIVE would lock the sync engine's connection out of the async one.
+@event.listens_for(engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async test on one session-wide event loop instead of a loop per test."""
+    session_loop = pytest.mark.asyncio(scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
+@pytest.fixture(scope="session")
+def db_schema():
+    """Create the database schema once for the whole test session."""
     Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db_session(db_schema):
+    """Create a database session for each test and empty the tables afterwards."""
     session = TestingSessionLocal()
     try:
         yield session
     finally:
         session.close()
-        Base.metadata.drop_all(bind=engine)
+        # The app commits through its own async connections, so a per-test
+        # SAVEPOINT could not roll those writes back; delete the rows instead
+        with engine.begin() as connection:
+            for table in reversed(Base.metadata.sorted_tables):
+                connection.execute(table.delete())
+        keyword_cache.clear()
+        keyword_list_cache.clear()
+
+
+@pytest.fixture(scope="session")
+def test_client():
+    """Start the app (including its lifespan) once for the whole test session."""
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture(scope="function")
-def client(db_session):
-    """Create a test client with database dependency override."""
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
+def client(test_client):
+    """
+    Provide the shared test client with the database dependency overridden.
+    Tests that reach the database also request db_session, which creates the
+    schema and empties the tables afterwards; the rest skip database setup.
+    """
+    async def override_get_db():
+        async with AsyncTestingSessionLocal() as session:
+            yield session
     
     app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as test_client:
-        yield test_client
+    yield test_client
     app.dependency_overrides.clear()
+    test_client.cookies.clear()
+    # Drop per-process state (e.g. cached Authentik flow stages) between tests
+    get_authentik_service.cache_clear()
 
 
 @pytest.fixture
@@ -97,7 +158,7 @@ def mock_user():
 
 
 @pytest.fixture
-def auth_headers(mock_user, mocker):
+def auth_headers(mock_user):
     """Create auth headers and mock the authentication."""
     from app.services.auth_service import get_current_user
     
@@ -111,3 +172,14 @@ def auth_headers(mock_user, mocker):
     if get_current_user in app.dependency_overrides:
         del app.dependency_overrides[get_current_user]
 
+
+
+@pytest.fixture
+def add_keywords(db_session, mock_user):
+    """Save keywords for the mock user straight through the ORM, bypassing the API."""
+    def _add(*keywords):
+        db_session.add_all(
+            UserKeyword(user_id=mock_user["sub"], keyword=keyword) for keyword in keywords
+        )
+        db_session.commit()
+    return _add
@@ -1,13 +1,25 @@
 import pytest
 from fastapi import status
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, patch
 
+from app.main import app
 from app.schemas.article import ArticleList, Article, ArticleSource, SortBy
+from app.services.news_service import get_news_service
 
 
 @pytest.fixture
+def news_service_mock():
+    """Replace the shared NewsService dependency with a mock for one test."""
+    # Child attributes of an AsyncMock are AsyncMocks, so fetch_articles is awaitable
+    mock_service = AsyncMock()
+    app.dependency_overrides[get_news_service] = lambda: mock_service
+    yield mock_service
+    app.dependency_overrides.pop(get_news_service, None)
+
+
+@pytest.fixture(scope="module")
 def mock_articles_response():
-    """Create a mock articles response."""
+    """Create a mock articles response, shared read-only by the tests in this module."""
     return ArticleList(
         articles=[
             Article(
@@ -36,10 +48,11 @@ def mock_articles_response():
     )
 
 
-def test_get_articles_requires_auth(client):
-    """Test that articles endpoint returns 401 without authentication."""
-    response = client.get("/api/articles")
-    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+@pytest.fixture
+def news_call(news_service_mock, mock_articles_response):
+    """Mocked news service that answers every fetch with mock_articles_response."""
+    news_service_mock.fetch_articles.return_value = mock_articles_response
+    return news_service_mock
 
 
 def test_get_articles_with_no_keywords(client, auth_headers, db_session):
@@ -51,127 +64,67 @@ def test_get_articles_with_no_keywords(client, auth_headers, db_session):
     assert data["totalResults"] == 0
 
 
-def test_get_articles_with_keywords(client, auth_headers, db_session, mock_articles_response):
+def test_get_articles_with_keywords(client, auth_headers, add_keywords, news_call):
     """Test fetching articles when user has keywords."""
     # Add a keyword first
-    client.post("/api/keywords", json={"keyword": "python"}, headers=auth_headers)
+    add_keywords("python")
     
-    with patch("app.routers.articles.NewsService") as MockNewsService:
-        mock_service = MagicMock()
-        mock_service.fetch_articles = AsyncMock(return_value=mock_articles_response)
-        MockNewsService.return_value = mock_service
-        
-        response = client.get("/api/articles", headers=auth_headers)
-        
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert len(data["articles"]) == 2
-        assert data["totalResults"] == 2
-        assert data["articles"][0]["title"] == "Test Article 1"
-        
-        # Verify the service was called with correct arguments
-        mock_service.fetch_articles.assert_called_once()
-        call_kwargs = mock_service.fetch_articles.call_args.kwargs
-        assert "python" in call_kwargs["keywords"]
-
-
-def test_get_articles_pagination(client, auth_headers, db_session, mock_articles_response):
+    response = client.get("/api/articles", headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert len(data["articles"]) == 2
+    assert data["totalResults"] == 2
+    assert data["articles"][0]["title"] == "Test Article 1"
+    
+    # Verify the service was called with correct arguments
+    news_call.fetch_articles.assert_called_once()
+    call_kwargs = news_call.fetch_articles.call_args.kwargs
+    assert "python" in call_kwargs["keywords"]
+
+
+def test_get_articles_pagination(client, auth_headers, add_keywords, news_call):
     """Test articles pagination parameters."""
-    client.post("/api/keywords", json={"keyword": "tech"}, headers=auth_headers)
-    
-    with patch("app.routers.articles.NewsService") as MockNewsService:
-        mock_service = MagicMock()
-        mock_service.fetch_articles = AsyncMock(return_value=mock_articles_response)
-        MockNewsService.return_value = mock_service
-        
-        response = client.get(
-            "/api/articles?page=2&page_size=50",
-            headers=auth_headers,
-        )
-        
-        assert response.status_code == status.HTTP_200_OK
-        
-        call_kwargs = mock_service.fetch_articles.call_args.kwargs
-        assert call_kwargs["page"] == 2
-        assert call_kwargs["page_size"] == 50
-
-
-def test_get_articles_invalid_page_rejected(client, auth_headers, db_session):
-    """Test that invalid page number is rejected."""
-    response = client.get("/api/articles?page=0", headers=auth_headers)
-    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    add_keywords("tech")
+    
+    response = client.get(
+        "/api/articles?page=2&page_size=50",
+        headers=auth_headers,
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    
+    call_kwargs = news_call.fetch_articles.call_args.kwargs
+    assert call_kwargs["page"] == 2
+    assert call_kwargs["page_size"] == 50
 
 
-def test_get_articles_invalid_page_size_rejected(client, auth_headers, db_session):
-    """Test that page_size over 100 is rejected."""
-    response = client.get("/api/articles?page_size=101", headers=auth_headers)
+@pytest.mark.parametrize("query", ["page=0", "page_size=101", "page_size=-1"])
+def test_get_articles_invalid_pagination_rejected(client, auth_headers, query):
+    """Test that a page below 1 or a page_size outside 1-100 is rejected."""
+    response = client.get(f"/api/articles?{query}", headers=auth_headers)
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
 
-def test_get_articles_negative_page_size_rejected(client, auth_headers, db_session):
-    """Test that negative page_size is rejected."""
-    response = client.get("/api/articles?page_size=-1", headers=auth_headers)
-    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+@pytest.mark.parametrize("sort_by,expected", [
+    ("relevancy", "relevancy"),
+    ("popularity", "popularity"),
+    (None, "publishedAt"),  # default
+])
+def test_get_articles_sort_by(client, auth_headers, add_keywords, news_call, sort_by, expected):
+    """Test that the sort order is passed through to the news service."""
+    add_keywords("news")
+    url = "/api/articles" if sort_by is None else f"/api/articles?sort_by={sort_by}"
+    
+    response = client.get(url, headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    
+    call_kwargs = news_call.fetch_articles.call_args.kwargs
+    assert call_kwargs["sort_by"] == expected
 
 
-def test_get_articles_sort_by_relevancy(client, auth_headers, db_session, mock_articles_response):
-    """Test sorting by relevancy."""
-    client.post("/api/keywords", json={"keyword": "news"}, headers=auth_headers)
-    
-    with patch("app.routers.articles.NewsService") as MockNewsService:
-        mock_service = MagicMock()
-        mock_service.fetch_articles = AsyncMock(return_value=mock_articles_response)
-        MockNewsService.return_value = mock_service
-        
-        response = client.get(
-            "/api/articles?sort_by=relevancy",
-            headers=auth_headers,
-        )
-        
-        assert response.status_code == status.HTTP_200_OK
-        
-        call_kwargs = mock_service.fetch_articles.call_args.kwargs
-        assert call_kwargs["sort_by"] == "relevancy"
-
-
-def test_get_articles_sort_by_popularity(client, auth_headers, db_session, mock_articles_response):
-    """Test sorting by popularity."""
-    client.post("/api/keywords", json={"keyword": "news"}, headers=auth_headers)
-    
-    with patch("app.routers.articles.NewsService") as MockNewsService:
-        mock_service = MagicMock()
-        mock_service.fetch_articles = AsyncMock(return_value=mock_articles_response)
-        MockNewsService.return_value = mock_service
-        
-        response = client.get(
-            "/api/articles?sort_by=popularity",
-            headers=auth_headers,
-        )
-        
-        assert response.status_code == status.HTTP_200_OK
-        
-        call_kwargs = mock_service.fetch_articles.call_args.kwargs
-        assert call_kwargs["sort_by"] == "popularity"
-
-
-def test_get_articles_sort_by_published_at(client, auth_headers, db_session, mock_articles_response):
-    """Test sorting by publishedAt (default)."""
-    client.post("/api/keywords", json={"keyword": "news"}, headers=auth_headers)
-    
-    with patch("app.routers.articles.NewsService") as MockNewsService:
-        mock_service = MagicMock()
-        mock_service.fetch_articles = AsyncMock(return_value=mock_articles_response)
-        MockNewsService.return_value = mock_service
-        
-        response = client.get("/api/articles", headers=auth_headers)
-        
-        assert response.status_code == status.HTTP_200_OK
-        
-        call_kwargs = mock_service.fetch_articles.call_args.kwargs
-        assert call_kwargs["sort_by"] == "publishedAt"
-
-
-def test_get_articles_invalid_sort_by_rejected(client, auth_headers, db_session):
+def test_get_articles_invalid_sort_by_rejected(client, auth_headers):
     """Test that invalid sort_by value is rejected."""
     response = client.get(
         "/api/articles?sort_by=invalid_sort",
@@ -180,62 +133,109 @@ def test_get_articles_invalid_sort_by_rejected(client, auth_headers, db_session)
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
 
-def test_get_articles_handles_service_value_error(client, auth_headers, db_session):
+def test_get_articles_handles_service_value_error(client, auth_headers, add_keywords, news_service_mock):
     """Test that ValueError from service returns 500."""
-    client.post("/api/keywords", json={"keyword": "test"}, headers=auth_headers)
-    
-    with patch("app.routers.articles.NewsService") as MockNewsService:
-        mock_service = MagicMock()
-        mock_service.fetch_articles = AsyncMock(
-            side_effect=ValueError("NEWS_API_KEY is not configured")
-        )
-        MockNewsService.return_value = mock_service
-        
-        response = client.get("/api/articles", headers=auth_headers)
-        
-        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
-        assert "NEWS_API_KEY" in response.json()["detail"]
-
-
-def test_get_articles_handles_service_exception(client, auth_headers, db_session):
+    add_keywords("test")
+    
+    news_service_mock.fetch_articles.side_effect = ValueError("NEWS_API_KEY is not configured")
+    
+    response = client.get("/api/articles", headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert "NEWS_API_KEY" in response.json()["detail"]
+
+
+def test_get_articles_handles_service_exception(client, auth_headers, add_keywords, news_service_mock):
     """Test that generic exceptions from service return 502."""
-    client.post("/api/keywords", json={"keyword": "test"}, headers=auth_headers)
-    
-    with patch("app.routers.articles.NewsService") as MockNewsService:
-        mock_service = MagicMock()
-        mock_service.fetch_articles = AsyncMock(
-            side_effect=Exception("News API error: Rate limit exceeded")
-        )
-        MockNewsService.return_value = mock_service
-        
-        response = client.get("/api/articles", headers=auth_headers)
-        
-        assert response.status_code == status.HTTP_502_BAD_GATEWAY
-        assert "Failed to fetch articles" in response.json()["detail"]
-
-
-def test_get_articles_multiple_keywords(client, auth_headers, db_session, mock_articles_response):
+    add_keywords("test")
+    
+    news_service_mock.fetch_articles.side_effect = Exception("News API error: Rate limit exceeded")
+    
+    response = client.get("/api/articles", headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_502_BAD_GATEWAY
+    assert "Failed to fetch articles" in response.json()["detail"]
+
+
+def test_get_articles_multiple_keywords(client, auth_headers, add_keywords, news_call):
     """Test fetching articles with multiple keywords."""
     # Add multiple keywords
+    add_keywords("python", "javascript", "react")
+    
+    response = client.get("/api/articles", headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    
+    call_kwargs = news_call.fetch_articles.call_args.kwargs
+    keywords = call_kwargs["keywords"]
+    assert len(keywords) == 3
+    assert "python" in keywords
+    assert "javascript" in keywords
+    assert "react" in keywords
+
+
+def test_get_articles_sees_keyword_changes(client, auth_headers, db_session, news_call):
+    """Test that cached keywords are refreshed after keywords are added or removed."""
     client.post("/api/keywords", json={"keyword": "python"}, headers=auth_headers)
-    client.post("/api/keywords", json={"keyword": "javascript"}, headers=auth_headers)
-    client.post("/api/keywords", json={"keyword": "react"}, headers=auth_headers)
-    
-    with patch("app.routers.articles.NewsService") as MockNewsService:
-        mock_service = MagicMock()
-        mock_service.fetch_articles = AsyncMock(return_value=mock_articles_response)
-        MockNewsService.return_value = mock_service
-        
-        response = client.get("/api/articles", headers=auth_headers)
-        
-        assert response.status_code == status.HTTP_200_OK
-        
-        call_kwargs = mock_service.fetch_articles.call_args.kwargs
-        keywords = call_kwargs["keywords"]
-        assert len(keywords) == 3
-        assert "python" in keywords
-        assert "javascript" in keywords
-        assert "react" in keywords
+    
+    client.get("/api/articles", headers=auth_headers)
+    assert news_call.fetch_articles.call_args.kwargs["keywords"] == ["python"]
+    
+    client.post("/api/keywords", json={"keyword": "rust"}, headers=auth_headers)
+    client.get("/api/articles", headers=auth_headers)
+    assert sorted(news_call.fetch_articles.call_args.kwargs["keywords"]) == ["python", "rust"]
+    
+    client.delete("/api/keywords/python", headers=auth_headers)
+    client.get("/api/articles", headers=auth_headers)
+    assert news_call.fetch_articles.call_args.kwargs["keywords"] == ["rust"]
+
+
+def test_get_articles_does_not_cache_keywords_that_raced_a_change(
+    client, auth_headers, mock_user, add_keywords, news_call
+):
+    """Test that keywords read before a concurrent keyword change are not cached afterwards."""
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from app.services.keyword_cache import invalidate_user_keywords
+    
+    add_keywords("python")
+    original_execute = AsyncSession.execute
+    
+    async def execute_then_change(self, *args, **kwargs):
+        # Another request adds a keyword and invalidates while this GET is mid-query
+        result = await original_execute(self, *args, **kwargs)
+        add_keywords("rust")
+        invalidate_user_keywords(mock_user["sub"])
+        return result
+    
+    with patch.object(AsyncSession, "execute", execute_then_change):
+        client.get("/api/articles", headers=auth_headers)
+    assert news_call.fetch_articles.call_args.kwargs["keywords"] == ["python"]
+    
+    client.get("/api/articles", headers=auth_headers)
+    assert sorted(news_call.fetch_articles.call_args.kwargs["keywords"]) == ["python", "rust"]
+
+
+def test_get_articles_projects_requested_fields(client, auth_headers, add_keywords, news_call):
+    """Test that the fields parameter trims each article to the requested keys."""
+    add_keywords("python")
+    
+    response = client.get("/api/articles?fields=title,url,source", headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["totalResults"] == 2
+    assert data["articles"][0] == {
+        "title": "Test Article 1",
+        "url": "https://example.com/article1",
+        "source": {"id": "bbc", "name": "BBC News"},
+    }
+
+
+def test_get_articles_unknown_field_rejected(client, auth_headers):
+    """Test that an unknown projection field is rejected."""
+    response = client.get("/api/articles?fields=title,bogus", headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "bogus" in response.json()["detail"]
 
 
 class TestSortByEnum:
@@ -1,41 +1,24 @@
 import pytest
+from unittest.mock import patch
 from fastapi import status
 
 
-def test_create_keyword(client, auth_headers, db_session):
-    """Test creating a new keyword."""
-    response = client.post(
-        "/api/keywords",
-        json={"keyword": "Python"},
-        headers=auth_headers,
-    )
-    assert response.status_code == status.HTTP_201_CREATED
-    data = response.json()
-    assert data["keyword"] == "python"  # Should be normalized to lowercase
-    assert "id" in data
-    assert "created_at" in data
-
-
-def test_create_keyword_normalizes_to_lowercase(client, auth_headers, db_session):
-    """Test that keywords are normalized to lowercase."""
-    response = client.post(
-        "/api/keywords",
-        json={"keyword": "JAVASCRIPT"},
-        headers=auth_headers,
-    )
-    assert response.status_code == status.HTTP_201_CREATED
-    assert response.json()["keyword"] == "javascript"
-
-
-def test_create_keyword_trims_whitespace(client, auth_headers, db_session):
-    """Test that keywords have whitespace trimmed."""
-    response = client.post(
-        "/api/keywords",
-        json={"keyword": "  react  "},
-        headers=auth_headers,
-    )
-    assert response.status_code == status.HTTP_201_CREATED
-    assert response.json()["keyword"] == "react"
+@pytest.mark.parametrize("payload,status_code,expected", [
+    ({"keyword": "Python"}, status.HTTP_201_CREATED, "python"),  # normalized to lowercase
+    ({"keyword": "JAVASCRIPT"}, status.HTTP_201_CREATED, "javascript"),
+    ({"keyword": "  react  "}, status.HTTP_201_CREATED, "react"),  # whitespace trimmed
+    ({"keyword": ""}, status.HTTP_422_UNPROCESSABLE_ENTITY, None),  # empty rejected
+])
+def test_create_keyword(client, auth_headers, db_session, payload, status_code, expected):
+    """Test creating a keyword, including normalization and validation."""
+    response = client.post("/api/keywords", json=payload, headers=auth_headers)
+    assert response.status_code == status_code
+    if expected is not None:
+        data = response.json()
+        assert data["keyword"] == expected
+        assert "id" in data
+        # Filled in by the database and read back with the insert
+        assert data["created_at"] is not None
 
 
 def test_create_duplicate_keyword_returns_409(client, auth_headers, db_session):
@@ -56,14 +39,18 @@ def test_create_duplicate_keyword_returns_409(client, auth_headers, db_session):
     assert response.status_code == status.HTTP_409_CONFLICT
 
 
-def test_get_keywords(client, auth_headers, db_session):
+SEED_KEYWORDS = ("python", "fastapi", "react")
+
+
+@pytest.fixture
+def seeded_keywords(add_keywords):
+    """Insert the starting keyword set for the mock user in one commit."""
+    add_keywords(*SEED_KEYWORDS)
+    return SEED_KEYWORDS
+
+
+def test_get_keywords(client, auth_headers, seeded_keywords):
     """Test retrieving all keywords for a user."""
-    # Create some keywords
-    client.post("/api/keywords", json={"keyword": "python"}, headers=auth_headers)
-    client.post("/api/keywords", json={"keyword": "fastapi"}, headers=auth_headers)
-    client.post("/api/keywords", json={"keyword": "react"}, headers=auth_headers)
-    
-    # Get keywords
     response = client.get("/api/keywords", headers=auth_headers)
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
@@ -72,46 +59,52 @@ def test_get_keywords(client, auth_headers, db_session):
     
     # Check keywords are present (order may vary)
     keyword_values = [k["keyword"] for k in data["keywords"]]
-    assert "python" in keyword_values
-    assert "fastapi" in keyword_values
-    assert "react" in keyword_values
+    assert sorted(keyword_values) == sorted(seeded_keywords)
 
 
-def test_delete_keyword(client, auth_headers, db_session):
-    """Test deleting a keyword."""
-    # Create keyword
-    client.post("/api/keywords", json={"keyword": "kubernetes"}, headers=auth_headers)
+def test_get_keywords_does_not_cache_list_that_raced_a_change(
+    client, auth_headers, mock_user, add_keywords
+):
+    """Test that a list read before a concurrent keyword change is not cached afterwards."""
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from app.services.keyword_cache import invalidate_user_keywords
     
-    # Verify it exists
-    response = client.get("/api/keywords", headers=auth_headers)
-    assert response.json()["total"] == 1
+    add_keywords("python")
+    original_execute = AsyncSession.execute
+    
+    async def execute_then_change(self, *args, **kwargs):
+        # Another request adds a keyword and invalidates while this GET is mid-query
+        result = await original_execute(self, *args, **kwargs)
+        add_keywords("rust")
+        invalidate_user_keywords(mock_user["sub"])
+        return result
     
-    # Delete keyword
-    response = client.delete("/api/keywords/kubernetes", headers=auth_headers)
+    with patch.object(AsyncSession, "execute", execute_then_change):
+        stale = client.get("/api/keywords", headers=auth_headers)
+    assert [k["keyword"] for k in stale.json()["keywords"]] == ["python"]
+    
+    response = client.get("/api/keywords", headers=auth_headers)
+    assert sorted(k["keyword"] for k in response.json()["keywords"]) == ["python", "rust"]
+
+
+def test_delete_keyword(client, auth_headers, seeded_keywords):
+    """Test deleting a keyword."""
+    response = client.delete("/api/keywords/python", headers=auth_headers)
     assert response.status_code == status.HTTP_200_OK
     
     # Verify it's gone
     response = client.get("/api/keywords", headers=auth_headers)
-    assert response.json()["total"] == 0
+    keyword_values = [k["keyword"] for k in response.json()["keywords"]]
+    assert sorted(keyword_values) == ["fastapi", "react"]
 
 
-def test_delete_nonexistent_keyword_returns_404(client, auth_headers, db_session):
+def test_delete_nonexistent_keyword_returns_404(client, auth_headers, db_schema):
     """Test that deleting a non-existent keyword returns 404."""
     response = client.delete("/api/keywords/nonexistent", headers=auth_headers)
     assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
-def test_empty_keyword_rejected(client, auth_headers, db_session):
-    """Test that empty keyword is rejected."""
-    response = client.post(
-        "/api/keywords",
-        json={"keyword": ""},
-        headers=auth_headers,
-    )
-    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
-
-
-def test_keywords_are_user_specific(client, auth_headers, db_session, mocker):
+def test_keywords_are_user_specific(client, auth_headers, db_session):
     """Test that keywords are isolated per user."""
     from app.services.auth_service import get_current_user
     
@@ -135,3 +128,41 @@ def test_keywords_are_user_specific(client, auth_headers, db_session, mocker):
     assert response.json()["total"] == 1
     assert response.json()["keywords"][0]["keyword"] == "user2keyword"
 
+
+
+def test_create_keywords_bulk(client, auth_headers, db_session):
+    """Test adding several keywords at once, skipping duplicates."""
+    client.post(
+        "/api/keywords",
+        json={"keyword": "docker"},
+        headers=auth_headers,
+    )
+    
+    response = client.post(
+        "/api/keywords/bulk",
+        json={"keywords": ["Python", "docker", "  python ", "Rust"]},
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    data = response.json()
+    assert sorted(kw["keyword"] for kw in data["created"]) == ["python", "rust"]
+    assert data["skipped"] == ["docker"]
+    
+    response = client.get("/api/keywords", headers=auth_headers)
+    assert response.json()["total"] == 3
+
+
+def test_get_keywords_served_from_cache(client, auth_headers, db_session):
+    """Test that repeat reads reuse the cached list until the keywords change."""
+    from app.models.keyword import UserKeyword
+    
+    client.post("/api/keywords", json={"keyword": "python"}, headers=auth_headers)
+    assert client.get("/api/keywords", headers=auth_headers).json()["total"] == 1
+    
+    # A row written behind the router's back is not seen until invalidation
+    db_session.add(UserKeyword(user_id="test-user-123", keyword="rust"))
+    db_session.commit()
+    assert client.get("/api/keywords", headers=auth_headers).json()["total"] == 1
+    
+    client.post("/api/keywords", json={"keyword": "go"}, headers=auth_headers)
+    assert client.get("/api/keywords", headers=auth_headers).json()["total"] == 3
@@ -0,0 +1,202 @@
+import io
+import json
+import logging
+import socket
+import struct
+import sys
+
+import msgpack
+import pytest
+
+from app import logging_config
+from app.config import get_settings
+from app.logging_config import (
+    BinaryFormatter,
+    ColoredFormatter,
+    JSONFormatter,
+    QueuedRecordHandler,
+    UnixDatagramHandler,
+    setup_logging,
+    stop_logging,
+)
+
+
+def make_record(msg="Hello %s", args=("world",), **extra):
+    """Create a log record with optional extra attributes."""
+    record = logging.LogRecord(
+        name="newsfeed.test",
+        level=logging.INFO,
+        pathname="/app/module.py",
+        lineno=42,
+        msg=msg,
+        args=args,
+        exc_info=None,
+    )
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_json_formatter_outputs_valid_json():
+    """Test that JSON formatter produces parseable JSON with the base fields."""
+    output = JSONFormatter().format(make_record())
+    data = json.loads(output)
+
+    assert data["level"] == "INFO"
+    assert data["logger"] == "newsfeed.test"
+    assert data["message"] == "Hello world"
+    assert data["location"] == "module.py:42"
+    assert data["timestamp"].endswith("Z")
+
+
+def test_json_formatter_includes_extra_fields():
+    """Test that user_id, request_id and duration_ms are included when present."""
+    record = make_record(user_id="user-1", request_id="req-1", duration_ms=12.5)
+    data = json.loads(JSONFormatter().format(record))
+
+    assert data["user_id"] == "user-1"
+    assert data["request_id"] == "req-1"
+    assert data["duration_ms"] == 12.5
+
+
+def test_json_formatter_escapes_message():
+    """Test that quotes and newlines in the message are escaped."""
+    record = make_record(msg='say "hi"\nbye', args=())
+    data = json.loads(JSONFormatter().format(record))
+
+    assert data["message"] == 'say "hi"\nbye'
+
+
+def test_json_formatter_includes_exception():
+    """Test that exception tracebacks are serialized under the exception key."""
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        record = make_record(exc_info=sys.exc_info())
+    data = json.loads(JSONFormatter().format(record))
+
+    assert "RuntimeError: boom" in data["exception"]
+    assert data["location"] == "module.py:42"
+
+
+def test_colored_formatter_reuses_timestamp_within_second():
+    """Test that records in the same second share the rendered timestamp."""
+    formatter = ColoredFormatter()
+    first = make_record()
+    second = make_record()
+    second.created = first.created
+
+    first_line = formatter.format(first)
+    second_line = formatter.format(second)
+
+    assert first_line == second_line
+    assert "INFO" in first_line
+    assert "module.py:42" in first_line
+    assert first_line.endswith("Hello world")
+
+
+def test_binary_handler_sends_length_prefixed_msgpack(tmp_path):
+    """Test that binary records reach the collector socket as length-prefixed msgpack."""
+    socket_path = str(tmp_path / "log.sock")
+    collector = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    collector.bind(socket_path)
+    handler = UnixDatagramHandler(socket_path)
+    handler.setFormatter(BinaryFormatter())
+    try:
+        handler.emit(make_record(user_id="user-1"))
+        frame = collector.recv(65536)
+    finally:
+        handler.close()
+        collector.close()
+
+    (length,) = struct.unpack("<I", frame[:4])
+    data = msgpack.unpackb(frame[4:])
+    assert length == len(frame) - 4
+    assert data["msg"] == "Hello world"
+    assert data["lvl"] == "INFO"
+    assert data["user_id"] == "user-1"
+
+
+def test_binary_handler_reports_dropped_records_without_collector(tmp_path, capsys):
+    """Test that a missing collector does not raise, and drops are reported once per interval."""
+    handler = UnixDatagramHandler(str(tmp_path / "missing.sock"))
+    handler.setFormatter(BinaryFormatter())
+    try:
+        for _ in range(3):
+            handler.emit(make_record())
+    finally:
+        handler.close()
+
+    reports = capsys.readouterr().err.splitlines()
+    assert len(reports) == 1
+    assert "missing.sock" in reports[0]
+    assert "dropped=1" in reports[0]
+
+
+def test_setup_logging_rejects_unknown_format():
+    """Test that a misspelled log format fails loudly instead of falling back to text."""
+    with pytest.raises(ValueError, match="Unknown log format 'jsn'"):
+        setup_logging(log_format="jsn")
+
+
+@pytest.fixture
+def log_output(monkeypatch):
+    """
+    Send the log listener's output to an in-memory buffer instead of stdout.
+    Bytes only reach the buffer when the text stream is flushed. The app's logging
+    setup is restored afterwards.
+    """
+    raw = io.BytesIO()
+    # Keep every stream alive: a collected TextIOWrapper closes the buffer under it
+    streams = []
+
+    def open_stream():
+        streams.append(io.TextIOWrapper(raw, encoding="utf-8"))
+        return streams[-1]
+
+    monkeypatch.setattr(logging_config, "_open_log_stream", open_stream)
+    yield raw
+    monkeypatch.undo()
+    settings = get_settings()
+    setup_logging(
+        environment=settings.environment,
+        log_level=settings.log_level,
+        log_format=settings.log_format,
+        log_socket_path=settings.log_socket_path,
+    )
+
+
+def test_queued_handler_merges_args_before_enqueueing():
+    """Test that the message is fixed when logged, not when the listener formats it."""
+    items = ["a"]
+    record = make_record(msg="items=%s", args=(items,))
+
+    prepared = QueuedRecordHandler(None).prepare(record)
+    items.append("b")
+
+    assert prepared.getMessage() == "items=['a']"
+    assert prepared.args is None
+
+
+def test_stop_logging_delivers_and_flushes_queued_records(log_output):
+    """Test that records logged through the queue are written and flushed on stop."""
+    setup_logging(log_format="json")
+    logging.getLogger("newsfeed.test").info("queued %d", 1)
+
+    stop_logging()
+
+    messages = [json.loads(line)["message"] for line in log_output.getvalue().decode().splitlines()]
+    assert "queued 1" in messages
+
+
+def test_setup_logging_again_stops_previous_listener(log_output):
+    """Test that reconfiguring logging stops the old listener after draining it."""
+    setup_logging(log_format="json")
+    first_listener = logging_config._listener
+    logging.getLogger("newsfeed.test").info("before reconfigure")
+
+    setup_logging(log_format="json")
+
+    assert logging_config._listener is not first_listener
+    assert first_listener._thread is None
+    assert b"before reconfigure" in log_output.getvalue()
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app import main
+from app.main import app
+
+
+async def call_app(method, path, events):
+    """Run one request through the ASGI app, appending each message type it sends to events."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+
+    messages = iter([{"type": "http.request", "body": b"", "more_body": False}])
+    response_sent = asyncio.Event()
+
+    async def receive():
+        # The client disconnects only once it has the whole response
+        message = next(messages, None)
+        if message is None:
+            await response_sent.wait()
+            message = {"type": "http.disconnect"}
+        return message
+
+    async def send(message):
+        events.append(message["type"])
+        if message["type"] == "http.response.body" and not message.get("more_body"):
+            response_sent.set()
+
+    await app(scope, receive, send)
+
+
+@pytest.fixture
+def log_request_calls(monkeypatch):
+    """Replace the access log writer with a mock that records when it ran."""
+    events = []
+    mock_log_request = AsyncMock(side_effect=lambda *args: events.append("log"))
+    monkeypatch.setattr(main, "log_request", mock_log_request)
+    return mock_log_request, events
+
+
+class TestRequestLogging:
+    """Test the access log middleware."""
+
+    def test_logs_request_line(self, client, caplog):
+        """Each request should produce one access line with method, path and status."""
+        with caplog.at_level(logging.INFO, logger="newsfeed.app.main"):
+            client.get("/health")
+
+        messages = [r.getMessage() for r in caplog.records if r.name == "newsfeed.app.main"]
+        assert len(messages) == 1
+        assert messages[0].startswith("GET /health | status=200 | duration=")
+
+    async def test_logs_after_response_is_sent(self, log_request_calls):
+        """The access line should be written by a background task once the body is sent."""
+        mock_log_request, events = log_request_calls
+
+        await call_app("GET", "/health", events)
+
+        # The body may arrive in several messages; the log line follows the last one
+        assert events[0] == "http.response.start"
+        assert events[-2:] == ["http.response.body", "log"]
+        assert events.count("log") == 1
+        method, path, status_code, _ = mock_log_request.await_args.args
+        assert (method, path, status_code) == ("GET", "/health", 200)
+
+    def test_chains_with_route_background_task(self, client, log_request_calls):
+        """A route's own background task should still run, before the access line."""
+        from app.services.authentik_service import AuthentikService
+
+        mock_log_request, events = log_request_calls
+        with patch.object(
+            AuthentikService, "logout", new_callable=AsyncMock,
+            side_effect=lambda token: events.append("revoke"),
+        ):
+            response = client.post(
+                "/api/auth/logout",
+                headers={"Authorization": "Bearer some-token"}
+            )
+
+        assert response.status_code == 200
+        assert events == ["revoke", "log"]
+
+    def test_skips_options_requests(self, client, log_request_calls):
+        """OPTIONS requests should not be logged."""
+        mock_log_request, _ = log_request_calls
+
+        client.options("/health")
+
+        mock_log_request.assert_not_called()
+
+    def test_skips_health_probe_in_production(self, client, log_request_calls, monkeypatch):
+        """Production health probes should not be logged, other paths still are."""
+        mock_log_request, _ = log_request_calls
+        monkeypatch.setattr(main.settings, "environment", "production")
+
+        client.get("/health")
+        mock_log_request.assert_not_called()
+
+        client.get("/")
+        mock_log_request.assert_awaited_once()
+
+
+class TestProbeEndpoints:
+    """Test the pre-serialized probe endpoints."""
+
+    @pytest.mark.parametrize("path, expected", [
+        ("/health", {"status": "healthy", "service": "newsfeed-api"}),
+        ("/", {"message": "Welcome to NewsFeed API", "docs": "/docs", "health": "/health"}),
+    ])
+    def test_returns_json_body(self, client, path, expected):
+        """Probe endpoints should return their static JSON bodies."""
+        response = client.get(path)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == expected
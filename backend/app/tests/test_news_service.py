@@ -1,20 +1,58 @@
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 import httpx
+from datetime import datetime, timezone
+import redis.asyncio as redis
 
-from app.services.news_service import NewsService
+from app.schemas.article import ArticleList
+from app.services.news_service import NewsService, get_news_service
 
 
-@pytest.fixture
-def news_service():
-    """Create a NewsService instance with a mock API key."""
+# News API response bodies shared across tests
+NO_ARTICLES = {"status": "ok", "totalResults": 0, "articles": []}
+ONE_ARTICLE = {
+    "status": "ok",
+    "totalResults": 1,
+    "articles": [
+        {
+            "source": {"id": "bbc", "name": "BBC News"},
+            "author": "John Doe",
+            "title": "Test Article",
+            "description": "Test description",
+            "url": "https://example.com/article",
+            "urlToImage": "https://example.com/image.jpg",
+            "publishedAt": "2024-01-15T10:00:00Z",
+            "content": "Full article content here"
+        }
+    ]
+}
+
+
+@pytest.fixture(scope="module")
+def news_settings():
+    """Patch the news service settings with a mock API key once for this module."""
     with patch('app.services.news_service.settings') as mock_settings:
         mock_settings.news_api_key = "test-api-key"
         mock_settings.news_api_base_url = "https://newsapi.org/v2"
-        yield NewsService()
+        mock_settings.redis_url = ""
+        yield mock_settings
+
+
+@pytest.fixture
+def news_api():
+    """
+    Stand-in for News API: the handler behind the service's httpx.MockTransport.
+    Tests set its return_value/side_effect and read the sent httpx.Request from its calls.
+    """
+    return MagicMock()
+
+
+@pytest.fixture
+def news_service(news_settings, news_api):
+    """Create a NewsService instance; each test gets empty caches and no pending fetches."""
+    return NewsService(transport=httpx.MockTransport(news_api))
 
 
-@pytest.mark.asyncio
 async def test_fetch_articles_with_empty_keywords(news_service):
     """Test that empty keywords returns empty list."""
     result = await news_service.fetch_articles([])
@@ -22,241 +60,412 @@ async def test_fetch_articles_with_empty_keywords(news_service):
     assert result.totalResults == 0
 
 
-@pytest.mark.asyncio
-async def test_fetch_articles_combines_keywords_with_or():
+@pytest.fixture
+def mock_sleep(mocker, news_service):
+    """Skip the news service's retry backoff waits; asyncio.sleep itself is left alone."""
+    return mocker.patch.object(news_service, "_sleep", new_callable=AsyncMock)
+
+
+async def test_fetch_articles_combines_keywords_with_or(news_service, news_api):
     """Test that keywords are combined with OR operator by default."""
-    with patch('app.services.news_service.settings') as mock_settings:
-        mock_settings.news_api_key = "test-api-key"
-        mock_settings.news_api_base_url = "https://newsapi.org/v2"
-        
-        service = NewsService()
-        
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "status": "ok",
-            "totalResults": 0,
-            "articles": []
-        }
-        
-        with patch.object(httpx.AsyncClient, 'get', new_callable=AsyncMock) as mock_get:
-            mock_get.return_value = mock_response
-            
-            await service.fetch_articles(["python", "javascript", "react"])
-            
-            # Check that the query parameter includes OR
-            call_kwargs = mock_get.call_args
-            params = call_kwargs.kwargs.get('params', {})
-            assert "OR" in params.get("q", "")
-
-
-@pytest.mark.asyncio
-async def test_fetch_articles_match_mode_any_uses_or():
+    news_api.return_value = httpx.Response(200, json=NO_ARTICLES)
+    
+    await news_service.fetch_articles(["python", "javascript", "react"])
+    
+    # Check that the query parameter includes OR
+    params = news_api.call_args.args[0].url.params
+    assert "OR" in params.get("q", "")
+
+
+async def test_fetch_articles_match_mode_any_uses_or(news_service, news_api):
     """Test that match_mode='any' combines keywords with OR."""
-    with patch('app.services.news_service.settings') as mock_settings:
-        mock_settings.news_api_key = "test-api-key"
-        mock_settings.news_api_base_url = "https://newsapi.org/v2"
-        
-        service = NewsService()
-        
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "status": "ok",
-            "totalResults": 0,
-            "articles": []
-        }
-        
-        with patch.object(httpx.AsyncClient, 'get', new_callable=AsyncMock) as mock_get:
-            mock_get.return_value = mock_response
-            
-            await service.fetch_articles(["tech", "ai"], match_mode="any")
-            
-            call_kwargs = mock_get.call_args
-            params = call_kwargs.kwargs.get('params', {})
-            query = params.get("q", "")
-            assert "OR" in query
-            assert "tech OR ai" == query
-
-
-@pytest.mark.asyncio
-async def test_fetch_articles_match_mode_all_uses_and():
+    news_api.return_value = httpx.Response(200, json=NO_ARTICLES)
+    
+    await news_service.fetch_articles(["tech", "ai"], match_mode="any")
+    
+    query = news_api.call_args.args[0].url.params.get("q", "")
+    assert "OR" in query
+    assert "tech OR ai" == query
+
+
+async def test_fetch_articles_match_mode_all_uses_and(news_service, news_api):
     """Test that match_mode='all' combines keywords with AND."""
-    with patch('app.services.news_service.settings') as mock_settings:
-        mock_settings.news_api_key = "test-api-key"
-        mock_settings.news_api_base_url = "https://newsapi.org/v2"
-        
-        service = NewsService()
-        
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "status": "ok",
-            "totalResults": 0,
-            "articles": []
-        }
-        
-        with patch.object(httpx.AsyncClient, 'get', new_callable=AsyncMock) as mock_get:
-            mock_get.return_value = mock_response
-            
-            await service.fetch_articles(["tech", "ai"], match_mode="all")
-            
-            call_kwargs = mock_get.call_args
-            params = call_kwargs.kwargs.get('params', {})
-            query = params.get("q", "")
-            assert "AND" in query
-            assert "tech AND ai" == query
-
-
-@pytest.mark.asyncio
-async def test_fetch_articles_default_match_mode_is_any():
+    news_api.return_value = httpx.Response(200, json=NO_ARTICLES)
+    
+    await news_service.fetch_articles(["tech", "ai"], match_mode="all")
+    
+    query = news_api.call_args.args[0].url.params.get("q", "")
+    assert "AND" in query
+    assert "tech AND ai" == query
+
+
+async def test_fetch_articles_default_match_mode_is_any(news_service, news_api):
     """Test that default match mode is 'any' (OR)."""
-    with patch('app.services.news_service.settings') as mock_settings:
-        mock_settings.news_api_key = "test-api-key"
-        mock_settings.news_api_base_url = "https://newsapi.org/v2"
-        
-        service = NewsService()
-        
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "status": "ok",
-            "totalResults": 0,
-            "articles": []
-        }
-        
-        with patch.object(httpx.AsyncClient, 'get', new_callable=AsyncMock) as mock_get:
-            mock_get.return_value = mock_response
-            
-            # Call without specifying match_mode - should default to OR
-            await service.fetch_articles(["keyword1", "keyword2"])
-            
-            call_kwargs = mock_get.call_args
-            params = call_kwargs.kwargs.get('params', {})
-            query = params.get("q", "")
-            assert "OR" in query
-            assert "AND" not in query
-
-
-@pytest.mark.asyncio
-async def test_fetch_articles_parses_response_correctly():
+    news_api.return_value = httpx.Response(200, json=NO_ARTICLES)
+    
+    # Call without specifying match_mode - should default to OR
+    await news_service.fetch_articles(["keyword1", "keyword2"])
+    
+    query = news_api.call_args.args[0].url.params.get("q", "")
+    assert "OR" in query
+    assert "AND" not in query
+
+
+async def test_fetch_articles_parses_response_correctly(news_service, news_api):
     """Test that API response is parsed into Article objects."""
-    with patch('app.services.news_service.settings') as mock_settings:
-        mock_settings.news_api_key = "test-api-key"
-        mock_settings.news_api_base_url = "https://newsapi.org/v2"
-        
-        service = NewsService()
-        
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "status": "ok",
-            "totalResults": 1,
-            "articles": [
-                {
-                    "source": {"id": "bbc", "name": "BBC News"},
-                    "author": "John Doe",
-                    "title": "Test Article",
-                    "description": "Test description",
-                    "url": "https://example.com/article",
-                    "urlToImage": "https://example.com/image.jpg",
-                    "publishedAt": "2024-01-15T10:00:00Z",
-                    "content": "Full article content here"
-                }
-            ]
-        }
-        
-        with patch.object(httpx.AsyncClient, 'get', new_callable=AsyncMock) as mock_get:
-            mock_get.return_value = mock_response
-            
-            result = await service.fetch_articles(["test"])
-            
-            assert result.totalResults == 1
-            assert len(result.articles) == 1
-            
-            article = result.articles[0]
-            assert article.title == "Test Article"
-            assert article.author == "John Doe"
-            assert article.source.name == "BBC News"
-            assert article.url == "https://example.com/article"
-
-
-@pytest.mark.asyncio
-async def test_fetch_articles_raises_on_missing_api_key():
+    news_api.return_value = httpx.Response(200, json=ONE_ARTICLE)
+    
+    result = await news_service.fetch_articles(["test"])
+    
+    assert result.totalResults == 1
+    assert len(result.articles) == 1
+    
+    article = result.articles[0]
+    assert article.title == "Test Article"
+    assert article.author == "John Doe"
+    assert article.source.name == "BBC News"
+    assert article.url == "https://example.com/article"
+    assert article.publishedAt == datetime(2024, 1, 15, 10, 0, tzinfo=timezone.utc)
+
+
+async def test_fetch_articles_raises_on_missing_api_key(mocker):
     """Test that missing API key raises ValueError."""
-    with patch('app.services.news_service.settings') as mock_settings:
-        mock_settings.news_api_key = ""
-        mock_settings.news_api_base_url = "https://newsapi.org/v2"
-        
-        service = NewsService()
-        
-        with pytest.raises(ValueError, match="NEWS_API_KEY is not configured"):
-            await service.fetch_articles(["test"])
+    mock_settings = mocker.patch('app.services.news_service.settings')
+    mock_settings.news_api_key = ""
+    mock_settings.news_api_base_url = "https://newsapi.org/v2"
+    mock_settings.redis_url = ""
+    
+    service = NewsService()
+    
+    with pytest.raises(ValueError, match="NEWS_API_KEY is not configured"):
+        await service.fetch_articles(["test"])
 
 
-@pytest.mark.asyncio
-async def test_fetch_articles_handles_api_error():
+async def test_fetch_articles_handles_api_error(news_service, news_api):
     """Test that API errors are properly handled."""
-    with patch('app.services.news_service.settings') as mock_settings:
-        mock_settings.news_api_key = "test-api-key"
-        mock_settings.news_api_base_url = "https://newsapi.org/v2"
-        
-        service = NewsService()
-        
-        mock_response = MagicMock()
-        mock_response.status_code = 401
-        mock_response.json.return_value = {
-            "status": "error",
-            "message": "Invalid API key"
-        }
-        
-        with patch.object(httpx.AsyncClient, 'get', new_callable=AsyncMock) as mock_get:
-            mock_get.return_value = mock_response
-            
-            with pytest.raises(Exception, match="News API error"):
-                await service.fetch_articles(["test"])
+    news_api.return_value = httpx.Response(401, json={
+        "status": "error",
+        "message": "Invalid API key"
+    })
+    
+    with pytest.raises(Exception, match="News API error"):
+        await news_service.fetch_articles(["test"])
 
 
-@pytest.mark.asyncio
-async def test_fetch_articles_handles_timeout():
+async def test_fetch_articles_handles_timeout(news_service, news_api):
     """Test that timeouts are handled gracefully."""
-    with patch('app.services.news_service.settings') as mock_settings:
-        mock_settings.news_api_key = "test-api-key"
-        mock_settings.news_api_base_url = "https://newsapi.org/v2"
-        
-        service = NewsService()
-        
-        with patch.object(httpx.AsyncClient, 'get', new_callable=AsyncMock) as mock_get:
-            mock_get.side_effect = httpx.TimeoutException("Connection timed out")
-            
-            with pytest.raises(Exception, match="timed out"):
-                await service.fetch_articles(["test"])
-
-
-@pytest.mark.asyncio
-async def test_fetch_articles_respects_pagination():
+    news_api.side_effect = httpx.TimeoutException("Connection timed out")
+    
+    with pytest.raises(Exception, match="timed out"):
+        await news_service.fetch_articles(["test"])
+
+
+async def test_fetch_articles_respects_pagination(news_service, news_api):
     """Test that pagination parameters are passed correctly."""
+    news_api.return_value = httpx.Response(200, json=NO_ARTICLES)
+    
+    await news_service.fetch_articles(["test"], page=3, page_size=50)
+    
+    params = news_api.call_args.args[0].url.params
+    assert params.get("page") == "3"
+    assert params.get("pageSize") == "50"
+
+
+def test_get_news_service_returns_shared_instance():
+    """Test that the NewsService dependency is a process-wide singleton."""
+    assert get_news_service() is get_news_service()
+
+
+async def test_news_service_reuses_http_client(news_service):
+    """Test that the HTTP client is created once and released on close."""
+    client = news_service.client
+    assert news_service.client is client
+    
+    await news_service.aclose()
+    assert news_service._client is None
+
+
+async def test_fetch_articles_caches_identical_requests(news_service, news_api):
+    """Test that repeated requests for the same keywords are served from cache."""
+    mock_response = httpx.Response(200, json=NO_ARTICLES)
+    
+    news_api.return_value = mock_response
+    
+    first = await news_service.fetch_articles(["tech", "ai"])
+    second = await news_service.fetch_articles(["ai", "tech"])
+    
+    assert news_api.call_count == 1
+    assert second is first
+    
+    await news_service.fetch_articles(["tech", "ai"], page=2)
+    assert news_api.call_count == 2
+
+
+async def test_fetch_articles_coalesces_concurrent_requests(news_service, news_api):
+    """Test that concurrent identical requests share one News API call."""
+    import asyncio
+    
+    async def slow_news_api(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=NO_ARTICLES)
+    
+    news_api.side_effect = slow_news_api
+    
+    results = await asyncio.gather(
+        *(news_service.fetch_articles(["tech", "ai"]) for _ in range(3))
+    )
+    
+    assert news_api.call_count == 1
+    assert results[0] is results[1] is results[2]
+    assert news_service._pending == {}
+
+async def test_fetch_articles_does_not_cache_errors(news_service, news_api, mock_sleep):
+    """Test that failed requests are retried instead of cached."""
+    mock_response = httpx.Response(503, json={
+        "status": "error",
+        "message": "Unavailable"
+    })
+    
+    news_api.return_value = mock_response
+    
+    for _ in range(2):
+        with pytest.raises(Exception, match="News API error"):
+            await news_service.fetch_articles(["test"])
+    
+    # Each call exhausts its own retries; nothing is served from cache
+    assert news_api.call_count == 2 * (NewsService.MAX_RETRIES + 1)
+
+
+@pytest.fixture
+def shared_cache_news_service(news_api):
+    """Create a NewsService with a Redis URL, a mocked Redis client and a mock News API."""
+    news_api.return_value = httpx.Response(200, json={
+        "status": "ok",
+        "totalResults": 1,
+        "articles": [{"source": {"name": "BBC"}, "title": "Test Article", "url": "https://example.com/a"}]
+    })
     with patch('app.services.news_service.settings') as mock_settings:
         mock_settings.news_api_key = "test-api-key"
         mock_settings.news_api_base_url = "https://newsapi.org/v2"
-        
-        service = NewsService()
-        
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_settings.redis_url = "redis://localhost:6379/1"
+        service = NewsService(transport=httpx.MockTransport(news_api))
+    
+    service._redis = MagicMock()
+    service._redis.get = AsyncMock(return_value=None)
+    service._redis.set = AsyncMock()
+    service._redis.delete = AsyncMock()
+    return service
+
+
+async def test_fetch_articles_stores_result_in_redis(shared_cache_news_service):
+    """Test that fetched results are shared through Redis with the sort-specific TTL."""
+    service = shared_cache_news_service
+    
+    result = await service.fetch_articles(["test"], sort_by="relevancy")
+    
+    key, body = service._redis.set.call_args.args
+    assert key.startswith("news:en:relevancy:any:1:20:")
+    assert service._redis.set.call_args.kwargs["ex"] == 600
+    assert ArticleList.model_validate_json(body) == result
+
+
+async def test_fetch_articles_serves_redis_hit_without_fetching(shared_cache_news_service, news_api):
+    """Test that a result cached by another worker skips the News API call."""
+    service = shared_cache_news_service
+    service._redis.get.return_value = ArticleList(articles=[], totalResults=7).model_dump_json()
+    
+    result = await service.fetch_articles(["test"])
+    
+    assert result.totalResults == 7
+    news_api.assert_not_called()
+
+
+@pytest.mark.parametrize("cached", [b"not json", b'{"articles": "old schema"}'])
+async def test_fetch_articles_discards_unreadable_redis_entry(shared_cache_news_service, news_api, cached):
+    """Test that a corrupt or old-schema Redis entry is deleted and treated as a miss."""
+    service = shared_cache_news_service
+    service._redis.get.return_value = cached
+    
+    result = await service.fetch_articles(["test"])
+    
+    assert result.totalResults == 1
+    news_api.assert_called_once()
+    key = service._redis.get.call_args.args[0]
+    service._redis.delete.assert_awaited_once_with(key)
+    # The fresh result replaces the bad entry
+    assert service._redis.set.call_args.args[0] == key
+
+
+async def test_fetch_articles_survives_redis_outage(shared_cache_news_service, news_api):
+    """Test that Redis errors fall back to fetching from News API."""
+    service = shared_cache_news_service
+    service._redis.get.side_effect = redis.ConnectionError("down")
+    service._redis.set.side_effect = redis.ConnectionError("down")
+    
+    result = await service.fetch_articles(["test"])
+    
+    assert result.totalResults == 1
+    news_api.assert_called_once()
+
+
+async def test_fetch_articles_handles_non_json_error_body(news_service, news_api, mock_sleep):
+    """Test that an HTML error page from a gateway still maps to a News API error."""
+    mock_response = httpx.Response(502, content=b"<html>Bad Gateway</html>")
+    
+    news_api.return_value = mock_response
+    
+    with pytest.raises(Exception, match="News API error: Unknown error"):
+        await news_service.fetch_articles(["test"])
+
+
+async def test_fetch_articles_splits_long_or_query(news_service, news_api):
+    """Test that an over-long OR search is split into chunks and merged by URL."""
+    keywords = [f"keyword{i:02d}" + "x" * 40 for i in range(20)]
+    
+    def fake_news_api(request):
+        # Every chunk finds one shared article plus one of its own
+        first = request.url.params["q"].split(" OR ")[0]
+        return httpx.Response(200, json={
             "status": "ok",
-            "totalResults": 0,
-            "articles": []
-        }
-        
-        with patch.object(httpx.AsyncClient, 'get', new_callable=AsyncMock) as mock_get:
-            mock_get.return_value = mock_response
-            
-            await service.fetch_articles(["test"], page=3, page_size=50)
-            
-            call_kwargs = mock_get.call_args
-            params = call_kwargs.kwargs.get('params', {})
-            assert params.get("page") == 3
-            assert params.get("pageSize") == 50
+            "totalResults": 2,
+            "articles": [
+                {"title": "Shared", "url": "https://example.com/shared",
+                 "publishedAt": "2024-01-01T00:00:00Z"},
+                {"title": first, "url": f"https://example.com/{first}",
+                 "publishedAt": "2024-01-15T10:00:00Z"},
+            ],
+        })
+    
+    news_api.side_effect = fake_news_api
+    
+    result = await news_service.fetch_articles(keywords)
+    
+    assert news_api.call_count > 1
+    for call in news_api.call_args_list:
+        assert len(call.args[0].url.params["q"]) <= NewsService.MAX_QUERY_LENGTH
+    urls = [article.url for article in result.articles]
+    assert urls.count("https://example.com/shared") == 1
+    assert len(urls) == news_api.call_count + 1
+    # Newest first across chunks
+    assert urls[-1] == "https://example.com/shared"
+
+
+async def test_fetch_articles_pages_split_query_by_rank(news_service, news_api):
+    """Test that page 2 of a split relevancy search continues where page 1 stopped."""
+    keywords = [f"keyword{i:02d}" + "x" * 40 for i in range(20)]
+    
+    def ranked_news_api(request):
+        # Each chunk returns its top results, in rank order
+        first = request.url.params["q"].split(" OR ")[0][:9]
+        size = int(request.url.params["pageSize"])
+        return httpx.Response(200, json={
+            "status": "ok",
+            "totalResults": 10,
+            "articles": [
+                {"title": f"{first}-{rank}", "url": f"https://example.com/{first}/{rank}"}
+                for rank in range(size)
+            ],
+        })
+    
+    news_api.side_effect = ranked_news_api
+    
+    first_page = await news_service.fetch_articles(keywords, page=1, page_size=2, sort_by="relevancy")
+    second_page = await news_service.fetch_articles(keywords, page=2, page_size=2, sort_by="relevancy")
+    
+    leaders = sorted({call.args[0].url.params["q"][:9] for call in news_api.call_args_list})
+    assert len(leaders) == 3
+    # Every chunk is read from its first result up to the end of the requested page
+    params = news_api.call_args.args[0].url.params
+    assert (params["page"], params["pageSize"]) == ("1", "4")
+    # Merged by rank: every chunk's best result before any chunk's second best
+    merged = [f"{leader}-{rank}" for rank in range(2) for leader in leaders]
+    assert [article.title for article in first_page.articles] == merged[:2]
+    assert [article.title for article in second_page.articles] == merged[2:4]
+    # Distinct articles fetched, plus each chunk's unfetched remainder
+    assert second_page.totalResults == 3 * 4 + 3 * (10 - 4)
+
+
+async def test_fetch_articles_does_not_split_all_mode(news_service, news_api):
+    """Test that AND searches are never split, since chunks would loosen the match."""
+    keywords = [f"keyword{i:02d}" + "x" * 40 for i in range(20)]
+    
+    news_api.return_value = httpx.Response(200, json=NO_ARTICLES)
+    await news_service.fetch_articles(keywords, match_mode="all")
+    
+    news_api.assert_called_once()
+
+
+async def test_fetch_articles_retries_transient_errors(news_service, news_api, mock_sleep):
+    """Test that a 503 followed by success is retried with exponential backoff."""
+    error = httpx.Response(503, json={"status": "error", "message": "Unavailable"})
+    ok = httpx.Response(200, json=NO_ARTICLES)
+    
+    news_api.side_effect = [error, error, ok]
+    result = await news_service.fetch_articles(["test"])
+    
+    assert result.totalResults == 0
+    assert news_api.call_count == 3
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [0.5, 1.0]
+
+
+async def test_fetch_articles_honors_retry_after(news_service, news_api, mock_sleep):
+    """Test that a 5xx waits for the server's Retry-After, capped at the maximum delay."""
+    unavailable = httpx.Response(
+        503, json={"status": "error", "message": "Unavailable"}, headers={"Retry-After": "30"}
+    )
+    ok = httpx.Response(200, json=NO_ARTICLES)
+    
+    news_api.side_effect = [unavailable, ok]
+    await news_service.fetch_articles(["test"])
+    
+    mock_sleep.assert_awaited_once_with(NewsService.RETRY_MAX_DELAY_SECONDS)
+
+
+@pytest.mark.parametrize("headers", [{}, {"Retry-After": "3600"}])
+async def test_fetch_articles_does_not_retry_quota_errors(news_service, news_api, mock_sleep, headers):
+    """Test that a 429 without a short Retry-After (e.g. daily quota used up) fails at once."""
+    news_api.return_value = httpx.Response(
+        429, json={"status": "error", "message": "Rate limited"}, headers=headers
+    )
+    
+    with pytest.raises(Exception, match="Rate limited"):
+        await news_service.fetch_articles(["test"])
+    
+    news_api.assert_called_once()
+    mock_sleep.assert_not_awaited()
+
+
+async def test_fetch_articles_retries_short_rate_limit(news_service, news_api, mock_sleep):
+    """Test that a 429 asking for a short wait is retried after that wait."""
+    rate_limited = httpx.Response(
+        429, json={"status": "error", "message": "Rate limited"}, headers={"Retry-After": "1"}
+    )
+    news_api.side_effect = [rate_limited, httpx.Response(200, json=NO_ARTICLES)]
+    
+    await news_service.fetch_articles(["test"])
+    
+    mock_sleep.assert_awaited_once_with(1.0)
+
+
+async def test_fetch_articles_chunks_share_retry_budget(news_service, news_api, mock_sleep):
+    """Test that the chunks of a split search draw on one shared retry budget."""
+    keywords = [f"keyword{i:02d}" + "x" * 40 for i in range(20)]
+    news_api.return_value = httpx.Response(503, json={"status": "error", "message": "Unavailable"})
+    
+    with pytest.raises(Exception, match="Unavailable"):
+        await news_service.fetch_articles(keywords)
+    
+    chunks = {call.args[0].url.params["q"] for call in news_api.call_args_list}
+    assert news_api.call_count == len(chunks) + NewsService.MAX_RETRIES
+
 
+async def test_fetch_articles_stops_retrying_past_time_budget(news_service, news_api, mock_sleep):
+    """Test that no retry is attempted when its wait would overrun the fetch's time budget."""
+    news_service.RETRY_BUDGET_SECONDS = 0.1
+    news_api.return_value = httpx.Response(503, json={"status": "error", "message": "Unavailable"})
+    
+    with pytest.raises(Exception, match="Unavailable"):
+        await news_service.fetch_articles(["test"])
+    
+    news_api.assert_called_once()
+    mock_sleep.assert_not_awaited()
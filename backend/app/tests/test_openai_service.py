@@ -0,0 +1,148 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import redis.asyncio as redis
+
+from app.services.openai_service import OpenAIService
+
+
+ARTICLES = [
+    {"title": "First", "source": "BBC", "description": "One"},
+    {"title": "Second", "source": "CNN", "description": "Two"},
+]
+
+
+@pytest.fixture
+def openai_service():
+    """Create an OpenAIService instance with a mocked client."""
+    with patch('app.services.openai_service.settings') as mock_settings:
+        mock_settings.openai_api_key = "test-api-key"
+        mock_settings.redis_url = ""
+        service = OpenAIService()
+    
+    service._client = MagicMock()
+    service._client.responses.create = AsyncMock(
+        return_value=MagicMock(output_text="Summary text")
+    )
+    return service
+
+
+async def test_summarize_articles_caches_by_content(openai_service):
+    """Test that the same article set is only summarized once, in any order."""
+    first = await openai_service.summarize_articles(ARTICLES)
+    second = await openai_service.summarize_articles(list(reversed(ARTICLES)))
+    
+    assert first == second == "Summary text"
+    assert openai_service._client.responses.create.call_count == 1
+
+
+async def test_summarize_articles_coalesces_concurrent_requests(openai_service):
+    """Test that concurrent requests for the same articles share one upstream call."""
+    results = await asyncio.gather(
+        *(openai_service.summarize_articles(ARTICLES) for _ in range(3))
+    )
+    
+    assert results == ["Summary text"] * 3
+    assert openai_service._client.responses.create.call_count == 1
+    assert openai_service._pending == {}
+
+
+async def test_summarize_articles_does_not_cache_errors(openai_service):
+    """Test that a failed summary is retried on the next request."""
+    openai_service._client.responses.create.side_effect = RuntimeError("boom")
+    
+    for _ in range(2):
+        with pytest.raises(Exception, match="Unable to connect to AI service"):
+            await openai_service.summarize_articles(ARTICLES)
+    
+    assert openai_service._client.responses.create.call_count == 2
+
+
+async def test_summarize_articles_shares_summaries_through_redis(openai_service):
+    """Test that summaries are stored in Redis and reused from it by other workers."""
+    openai_service._redis = MagicMock()
+    openai_service._redis.get = AsyncMock(return_value=None)
+    openai_service._redis.set = AsyncMock()
+    
+    await openai_service.summarize_articles(ARTICLES)
+    
+    key, summary = openai_service._redis.set.call_args.args
+    assert key.startswith("openai:sum:gpt-4o-mini:")
+    assert summary == "Summary text"
+    assert openai_service._redis.set.call_args.kwargs["ex"] == OpenAIService.CACHE_TTL_SECONDS
+    
+    # A fresh worker finds the summary in Redis instead of calling OpenAI
+    openai_service._cache.clear()
+    openai_service._redis.get.return_value = b"Shared summary"
+    
+    assert await openai_service.summarize_articles(ARTICLES) == "Shared summary"
+    assert openai_service._client.responses.create.call_count == 1
+
+
+async def test_summarize_articles_survives_redis_outage(openai_service):
+    """Test that Redis errors fall back to calling OpenAI."""
+    openai_service._redis = MagicMock()
+    openai_service._redis.get = AsyncMock(side_effect=redis.ConnectionError("down"))
+    openai_service._redis.set = AsyncMock(side_effect=redis.ConnectionError("down"))
+    
+    assert await openai_service.summarize_articles(ARTICLES) == "Summary text"
+
+
+async def test_stream_summary_yields_deltas_and_caches_result(openai_service):
+    """Test that streamed deltas are forwarded and the joined summary is cached."""
+    events = [
+        MagicMock(type="response.created"),
+        MagicMock(type="response.output_text.delta", delta="Streamed "),
+        MagicMock(type="response.output_text.delta", delta="summary"),
+        MagicMock(type="response.completed"),
+    ]
+    
+    class FakeStream:
+        async def __aenter__(self):
+            return self
+        
+        async def __aexit__(self, *args):
+            return None
+        
+        async def __aiter__(self):
+            for event in events:
+                yield event
+    
+    openai_service._client.responses.stream = MagicMock(return_value=FakeStream())
+    
+    chunks = [chunk async for chunk in openai_service.stream_summary(ARTICLES)]
+    assert chunks == ["Streamed ", "summary"]
+    
+    # The completed summary is now served whole, by either entry point
+    assert await openai_service.summarize_articles(ARTICLES) == "Streamed summary"
+    assert [chunk async for chunk in openai_service.stream_summary(ARTICLES)] == ["Streamed summary"]
+    assert openai_service._client.responses.stream.call_count == 1
+    openai_service._client.responses.create.assert_not_called()
+
+
+def test_build_prompt_fills_missing_fields(openai_service):
+    """Test that articles with missing source/description get placeholders."""
+    prompt = openai_service._build_prompt([
+        {"title": "First", "source": None, "description": None},
+        {"title": "Second", "source": "CNN", "description": "Two"},
+    ])
+    
+    assert "**First**\nSource: Unknown\nDescription: No description" in prompt
+    assert "**Second**\nSource: CNN\nDescription: Two" in prompt
+    assert "None" not in prompt
+
+
+def test_build_prompt_trims_long_text_at_word_boundary(openai_service):
+    """Test that long titles and descriptions are cut at a word boundary."""
+    prompt = openai_service._build_prompt([
+        {"title": "word " * 50, "source": "CNN", "description": "lorem " * 100},
+    ])
+    
+    title_line, _, description_line = prompt.split("Articles:\n")[1].split("\n\nSummary:")[0].split("\n")
+    title = title_line.strip("*")
+    description = description_line.removeprefix("Description: ")
+    assert len(title) <= OpenAIService.MAX_PROMPT_TITLE_CHARS + 1
+    assert title.endswith("word…")
+    assert len(description) <= OpenAIService.MAX_PROMPT_DESCRIPTION_CHARS + 1
+    assert description.endswith("lorem…")
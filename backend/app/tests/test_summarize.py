@@ -0,0 +1,99 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import status
+
+from app.main import app
+from app.services.openai_service import OpenAIRateLimitError, get_openai_service
+
+
+def override_stream(*chunks, error=None):
+    """Install an OpenAIService mock whose stream yields chunks, then optionally raises."""
+    async def stream_summary(articles):
+        for chunk in chunks:
+            yield chunk
+        if error is not None:
+            raise error
+    
+    mock_service = MagicMock()
+    mock_service.stream_summary = stream_summary
+    app.dependency_overrides[get_openai_service] = lambda: mock_service
+
+
+def test_summarize_rejects_too_many_articles(client, auth_headers):
+    """Test that more than 50 articles is rejected by validation."""
+    response = client.post(
+        "/api/summarize",
+        json={"articles": [{"title": f"Article {i}"} for i in range(51)]},
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.parametrize("field, limit", [
+    ("title", 500),
+    ("description", 5_000),
+    ("source", 200),
+])
+def test_summarize_rejects_oversized_field(client, auth_headers, field, limit):
+    """Test that an article field over its length limit is rejected before OpenAI is called."""
+    mock_service = MagicMock()
+    app.dependency_overrides[get_openai_service] = lambda: mock_service
+    article = {"title": "Article", field: "x" * limit}
+    
+    accepted = {"articles": [article]}
+    rejected = {"articles": [{**article, field: "x" * (limit + 1)}]}
+    
+    response = client.post("/api/summarize", json=rejected, headers=auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    mock_service.summarize_articles.assert_not_called()
+    
+    mock_service.summarize_articles = AsyncMock(return_value="Summary")
+    response = client.post("/api/summarize", json=accepted, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_stream_summary_sends_deltas_as_events(client, auth_headers):
+    """Test that streamed text arrives as SSE data events followed by done."""
+    override_stream("Hello", " world")
+    
+    response = client.post(
+        "/api/summarize/stream",
+        json={"articles": [{"title": "Article"}]},
+        headers=auth_headers,
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == (
+        'data: {"delta":"Hello"}\n\n'
+        'data: {"delta":" world"}\n\n'
+        'event: done\ndata: {}\n\n'
+    )
+
+
+def test_stream_summary_error_before_output_uses_http_status(client, auth_headers):
+    """Test that a failure before the first chunk is a normal HTTP error."""
+    override_stream(error=OpenAIRateLimitError())
+    
+    response = client.post(
+        "/api/summarize/stream",
+        json={"articles": [{"title": "Article"}]},
+        headers=auth_headers,
+    )
+    
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def test_stream_summary_error_mid_stream_sends_error_event(client, auth_headers):
+    """Test that a failure after output has started is reported as an error event."""
+    override_stream("Partial", error=OpenAIRateLimitError())
+    
+    response = client.post(
+        "/api/summarize/stream",
+        json={"articles": [{"title": "Article"}]},
+        headers=auth_headers,
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text.endswith('event: error\ndata: {"detail":"OpenAI rate limit exceeded. Please try again later.","status_code":429}\n\n')
@@ -12,10 +12,10 @@ CREATE TABLE IF NOT EXISTS user_keywords (
     user_id VARCHAR(255) NOT NULL,
     keyword VARCHAR(100) NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    UNIQUE(user_id, keyword)
+    CONSTRAINT uq_user_keyword UNIQUE(user_id, keyword)
 );
 
--- Index for faster queries by user
-CREATE INDEX IF NOT EXISTS idx_user_keywords_user_id ON user_keywords(user_id);
-CREATE INDEX IF NOT EXISTS idx_user_keywords_created_at ON user_keywords(created_at DESC);
+-- The unique index above already covers lookups by user_id and by (user_id, keyword).
+-- This one lets a user's keyword list be read newest-first without sorting.
+CREATE INDEX IF NOT EXISTS idx_user_keywords_user_id_created_at ON user_keywords(user_id, created_at DESC);
 
@@ -0,0 +1,21 @@
+-- Bring a database created from an older init.sql up to date with the current one.
+-- init.sql only runs on an empty data volume; this script is safe to run repeatedly.
+
+-- Newest-first listing of a user's keywords
+CREATE INDEX IF NOT EXISTS idx_user_keywords_user_id_created_at ON user_keywords(user_id, created_at DESC);
+
+-- Covered by the unique index (user_id first) and by the index above
+DROP INDEX IF EXISTS idx_user_keywords_user_id;
+DROP INDEX IF EXISTS idx_user_keywords_created_at;
+
+-- Give the unique constraint the name used by init.sql and the model
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'user_keywords_user_id_keyword_key'
+          AND conrelid = 'user_keywords'::regclass
+    ) THEN
+        ALTER TABLE user_keywords RENAME CONSTRAINT user_keywords_user_id_keyword_key TO uq_user_keyword;
+    END IF;
+END $$;